@@ -0,0 +1,73 @@
+"""
+Benchmark the vectorized calorie methods against the scalar loop.
+
+Run from the project root:
+    python -m benchmarks.bench_calories --samples 100000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from calorie_calculator import CalorieCalculator
+
+
+def make_session(n, seed=0):
+    """Generate a synthetic recorded session of n samples"""
+    rng = np.random.default_rng(seed)
+    return {
+        "heart_rates": rng.uniform(30, 230, n),
+        "durations": rng.uniform(0.01, 0.1, n),  # minutes per sample
+        "temps": rng.uniform(36.0, 38.5, n),
+        "bmis": rng.uniform(16, 35, n),
+        "intensities": rng.choice(["light", "moderate", "intense", "unknown"], n),
+    }
+
+
+def scalar_loop(calc, session, weight, age, gender):
+    hr_cals = []
+    met_cals = []
+    for hr, dur, temp, bmi, intensity in zip(session["heart_rates"], session["durations"],
+                                             session["temps"], session["bmis"], session["intensities"]):
+        hr_cals.append(calc.calculate_calories_from_heart_rate(hr, weight, age, gender, dur))
+        met_cals.append(calc.calculate_calories_from_met(weight, dur / 60, str(intensity), temp, bmi))
+    return np.array(hr_cals), np.array(met_cals)
+
+
+def vectorized(calc, session, weight, age, gender):
+    hr_cals, _ = calc.calculate_calories_from_heart_rate_batch(
+        session["heart_rates"], weight, age, gender, session["durations"])
+    met_cals, _ = calc.calculate_calories_from_met_batch(
+        weight, session["durations"] / 60, session["intensities"], session["temps"], session["bmis"])
+    return hr_cals, met_cals
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scalar vs vectorized calorie benchmark")
+    parser.add_argument("--samples", type=int, default=100000)
+    args = parser.parse_args()
+
+    calc = CalorieCalculator()
+    session = make_session(args.samples)
+    weight, age, gender = 70.0, 30, "female"
+
+    start = time.perf_counter()
+    scalar_hr, scalar_met = scalar_loop(calc, session, weight, age, gender)
+    scalar_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    vec_hr, vec_met = vectorized(calc, session, weight, age, gender)
+    vec_time = time.perf_counter() - start
+
+    # The batch versions must agree with the scalar ones
+    assert np.allclose(scalar_hr, vec_hr), "heart rate results differ"
+    assert np.allclose(scalar_met, vec_met), "MET results differ"
+
+    print(f"samples:    {args.samples}")
+    print(f"scalar:     {scalar_time * 1000:.1f} ms")
+    print(f"vectorized: {vec_time * 1000:.1f} ms")
+    print(f"speedup:    {scalar_time / vec_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""
+Benchmarks for the pose pipeline hot paths, using synthetic data only.
+
+Run from the project root:
+    python -m benchmarks.bench_pipeline --output bench_results.json
+
+Each benchmark reports per-call timings in microseconds. With --output the
+results are also written as JSON (tagged with the current git commit) so
+regressions can be tracked across commits.
+"""
+import os
+import sys
+import io
+import json
+import time
+import argparse
+import platform
+import tempfile
+import subprocess
+import contextlib
+
+import numpy as np
+
+# Importing server must not start uvicorn
+os.environ.setdefault("YOGKALP_DISABLE_SERVER", "1")
+
+from pose_estimator import PoseEstimator
+from benchmarks import synthetic
+
+LIBRARY_SIZES = [10, 1000, 10000]
+
+
+def measure(func, repeat, setup=None):
+    """Call func `repeat` times and return timing stats in microseconds"""
+    timings = np.empty(repeat)
+    for i in range(repeat):
+        arg = setup() if setup else None
+        start = time.perf_counter()
+        func(arg) if setup else func()
+        timings[i] = time.perf_counter() - start
+    timings *= 1e6
+    return {
+        "calls": repeat,
+        "mean_us": float(timings.mean()),
+        "median_us": float(np.median(timings)),
+        "p95_us": float(np.percentile(timings, 95)),
+        "min_us": float(timings.min()),
+    }
+
+
+def bench_extract_joint_angles(estimator, rng, repeat):
+    landmark_sets = [synthetic.make_landmarks(rng) for _ in range(64)]
+    it = iter(range(repeat))
+    return {"extract_joint_angles": measure(
+        lambda lms: estimator.extract_joint_angles(lms), repeat,
+        setup=lambda: landmark_sets[next(it) % len(landmark_sets)])}
+
+
+def bench_pose_accuracy(estimator, rng, repeat):
+    estimator.set_named_poses(synthetic.make_pose_library(estimator, 1, rng))
+    features = estimator.extract_joint_angles(synthetic.make_landmarks(rng))
+    return {"calculate_pose_accuracy": measure(
+        lambda: estimator.calculate_pose_accuracy(features, "pose_0"), repeat)}
+
+
+def bench_best_pose(estimator, rng, repeat):
+    results = {}
+    features = estimator.extract_joint_angles(synthetic.make_landmarks(rng))
+    for size in LIBRARY_SIZES:
+        estimator.set_named_poses(synthetic.make_pose_library(estimator, size, rng))
+        # Keep the total work roughly constant across library sizes
+        calls = max(3, repeat * 10 // size)
+        results[f"find_best_pose[{size}]"] = measure(lambda: estimator.find_best_pose(features), calls)
+    return results
+
+
+def bench_save_load(estimator, rng, repeat):
+    results = {}
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp, contextlib.redirect_stdout(io.StringIO()):
+        # save_poses/load_poses use paths relative to the working directory
+        os.chdir(tmp)
+        try:
+            for size in LIBRARY_SIZES:
+                estimator.set_named_poses(synthetic.make_pose_library(estimator, size, rng))
+                calls = max(3, repeat * 10 // size)
+                results[f"save_poses[{size}]"] = measure(estimator.save_poses, calls)
+                results[f"load_poses[{size}]"] = measure(estimator.load_poses, calls)
+        finally:
+            os.chdir(cwd)
+    return results
+
+
+def bench_health_ingest(rng, repeat):
+    import server
+    payloads = [synthetic.make_health_payload(rng) for _ in range(256)]
+    it = iter(range(repeat))
+
+    def ingest(data):
+        # Same steps as the /esp32/health handler body, minus the socket
+        print(f"Received health data: {data}")
+        server.update_health_data(json.loads(data))
+        server.record_esp_data()
+        print(f"Updated health data: {server.esp_data}")
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        stats = measure(ingest, repeat, setup=lambda: payloads[next(it) % len(payloads)])
+    return {"health_ingest": stats}
+
+
+def bench_ppg(rng, repeat):
+    from ppg import PPGStream
+    stream = PPGStream()
+    stream.add(*synthetic.make_ppg_samples(rng, stream.size))
+    # 25-sample batches, i.e. four per second per device at 100 Hz
+    batches = [synthetic.make_ppg_samples(rng, 25, stream.size + 25 * i) for i in range(64)]
+    it = iter(range(repeat))
+    return {"ppg_batch[25]": measure(lambda batch: stream.add(*batch), repeat,
+                                     setup=lambda: batches[next(it) % len(batches)])}
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pose pipeline benchmarks")
+    parser.add_argument("--repeat", type=int, default=1000, help="calls per micro-benchmark")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write machine-readable results to this JSON file")
+    parser.add_argument("--skip-server", action="store_true", help="skip the health ingest benchmark")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    with contextlib.redirect_stdout(io.StringIO()):
+        estimator = PoseEstimator(load_models=False)
+
+    results = {}
+    results.update(bench_extract_joint_angles(estimator, rng, args.repeat))
+    results.update(bench_pose_accuracy(estimator, rng, args.repeat))
+    results.update(bench_best_pose(estimator, rng, args.repeat))
+    results.update(bench_save_load(estimator, rng, args.repeat))
+    if not args.skip_server:
+        results.update(bench_health_ingest(rng, args.repeat))
+    results.update(bench_ppg(rng, args.repeat))
+
+    for name, stats in results.items():
+        print(f"{name:<32} median {stats['median_us']:>12.1f} us   p95 {stats['p95_us']:>12.1f} us"
+              f"   ({stats['calls']} calls)")
+
+    if args.output:
+        report = {
+            "commit": git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "seed": args.seed,
+            "results": results,
+        }
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=4)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+"""
+ESP32 board simulator and WebSocket load test for the ingest server.
+
+Starts server.app in-process with uvicorn, then opens simulated boards
+against /esp32/health, /esp32/exercise and /esp32/camera. Each board is
+its own device (device_id sim-<endpoint>-<n>) and sends synthetic payloads,
+or payloads replayed from a recording, at a fixed rate.
+
+Run from the project root (needs uvicorn and websockets):
+    python -m benchmarks.esp32_simulator --health 20 --exercise 20 --camera 5 --rate 10
+    python -m benchmarks.esp32_simulator --replay recorded.jsonl --output ingest.json
+
+A replay file has one JSON object per line: {"endpoint": "health", "data": {...}}.
+Endpoints missing from the file fall back to synthetic payloads.
+
+Reported:
+    throughput      messages applied by the server per second
+    latency         from a board sending a message to its values landing in the
+                    device session (the same step that updates esp_data for the
+                    primary device, here the first health board)
+    loop lag        how late a short timer on the server's event loop fires
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import platform
+import threading
+import subprocess
+import contextlib
+from collections import deque
+
+import numpy as np
+
+# Importing server must not start its own uvicorn thread
+os.environ.setdefault("YOGKALP_DISABLE_SERVER", "1")
+
+import server
+from benchmarks import synthetic
+
+ENDPOINTS = {"health": "/esp32/health", "exercise": "/esp32/exercise", "camera": "/esp32/camera"}
+LAG_INTERVAL = 0.01  # Seconds between event-loop lag samples
+
+
+class IngestProbe:
+    """
+    Times each message from send to apply by wrapping server.apply_device_update.
+
+    Every simulated board is a separate device with one connection, and the
+    server handles a connection's messages in order, so the n-th apply for
+    a device belongs to its n-th send.
+    """
+
+    def __init__(self):
+        self.send_times = {}  # device_id -> deque of perf_counter send times
+        self.latencies = []
+        self.applied = 0
+        self.first_send = None
+        self.last_apply = None
+        self.original = server.apply_device_update
+
+    def install(self):
+        def apply_device_update(device_id, changes):
+            self.original(device_id, changes)
+            pending = self.send_times.get(device_id)
+            if pending:
+                now = time.perf_counter()
+                self.latencies.append(now - pending.popleft())
+                self.applied += 1
+                self.last_apply = now
+        server.apply_device_update = apply_device_update
+
+    def uninstall(self):
+        server.apply_device_update = self.original
+
+    def register(self, device_id):
+        self.send_times[device_id] = deque()
+
+    def sending(self, device_id):
+        now = time.perf_counter()
+        if self.first_send is None:
+            self.first_send = now
+        self.send_times[device_id].append(now)
+
+
+class PayloadSource:
+    """Next payload per endpoint: replayed in order from a recording, else synthetic"""
+
+    def __init__(self, rng, replay_path=None):
+        self.rng = rng
+        self.recorded = {}
+        if replay_path:
+            with open(replay_path, "r") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self.recorded.setdefault(entry["endpoint"], []).append(json.dumps(entry["data"]))
+
+    def make(self, endpoint, index):
+        recorded = self.recorded.get(endpoint)
+        if recorded:
+            return recorded[index % len(recorded)]
+        if endpoint == "health":
+            return synthetic.make_health_payload(self.rng)
+        if endpoint == "exercise":
+            return synthetic.make_exercise_payload(self.rng, steps=index)
+        return synthetic.make_camera_payload(self.rng)
+
+
+async def run_board(base_url, endpoint, device_id, rate, duration, payloads, probe, rng):
+    """Connect one simulated board and send at `rate` messages per second for `duration` seconds"""
+    import websockets
+
+    url = f"{base_url}{ENDPOINTS[endpoint]}?device_id={device_id}"
+    loop = asyncio.get_running_loop()
+    interval = 1 / rate
+    async with websockets.connect(url) as ws:
+        # Fixed schedule from a random phase, so boards do not send in lockstep and delays do not drift
+        start = loop.time() + rng.uniform(0, interval)
+        count = int(duration * rate)
+        for index in range(count):
+            await asyncio.sleep(max(0.0, start + index * interval - loop.time()))
+            probe.sending(device_id)
+            await ws.send(payloads.make(endpoint, index))
+    return count
+
+
+async def monitor_loop_lag(lags, stop):
+    """Record how late a LAG_INTERVAL sleep wakes up on the current event loop"""
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        start = loop.time()
+        await asyncio.sleep(LAG_INTERVAL)
+        lags.append(max(0.0, loop.time() - start - LAG_INTERVAL))
+
+
+def start_server(port, lags, stop):
+    """Run server.app with uvicorn plus the lag monitor on a background thread"""
+    import uvicorn
+
+    config = uvicorn.Config(server.app, host="127.0.0.1", port=port, log_level="warning", ws_max_queue=1024)
+    uvicorn_server = uvicorn.Server(config)
+
+    async def serve():
+        monitor = asyncio.create_task(monitor_loop_lag(lags, stop))
+        await uvicorn_server.serve()
+        await monitor
+
+    thread = threading.Thread(target=lambda: asyncio.run(serve()), daemon=True)
+    thread.start()
+    while not uvicorn_server.started:
+        if not thread.is_alive():
+            raise RuntimeError(f"Server failed to start on port {port}")
+        time.sleep(0.05)
+    return uvicorn_server, thread
+
+
+async def run_boards(args, payloads, probe, rng):
+    boards = []
+    for endpoint in ENDPOINTS:
+        for i in range(getattr(args, endpoint)):
+            device_id = f"sim-{endpoint}-{i}"
+            probe.register(device_id)
+            boards.append(run_board(f"ws://127.0.0.1:{args.port}", endpoint, device_id,
+                                    args.rate, args.duration, payloads, probe, rng))
+    results = await asyncio.gather(*boards, return_exceptions=True)
+    errors = [result for result in results if isinstance(result, Exception)]
+    return sum(result for result in results if not isinstance(result, Exception)), errors
+
+
+def percentiles_ms(values):
+    if not values:
+        return None
+    values = np.asarray(values) * 1000
+    return {
+        "count": int(values.size),
+        "mean_ms": float(values.mean()),
+        "p50_ms": float(np.percentile(values, 50)),
+        "p95_ms": float(np.percentile(values, 95)),
+        "p99_ms": float(np.percentile(values, 99)),
+        "max_ms": float(values.max()),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ESP32 WebSocket ingest load test")
+    parser.add_argument("--health", type=int, default=10, help="simulated health boards")
+    parser.add_argument("--exercise", type=int, default=10, help="simulated exercise boards")
+    parser.add_argument("--camera", type=int, default=2, help="simulated camera boards")
+    parser.add_argument("--rate", type=float, default=10.0, help="messages per second per board")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds each board sends for")
+    parser.add_argument("--replay", help="JSON lines file of recorded payloads to replay")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write machine-readable results to this JSON file")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    payloads = PayloadSource(rng, args.replay)
+    probe = IngestProbe()
+    lags = []
+    stop = threading.Event()
+    if args.health:
+        server.primary_device = "sim-health-0"  # Exercise the esp_data mirror as well
+
+    # The handlers print every message; keep that off the terminal
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        probe.install()
+        uvicorn_server, thread = start_server(args.port, lags, stop)
+        try:
+            sent, errors = asyncio.run(run_boards(args, payloads, probe, rng))
+            # Let the server drain what is still queued
+            deadline = time.perf_counter() + 5
+            while probe.applied < sent and time.perf_counter() < deadline:
+                time.sleep(0.01)
+        finally:
+            stop.set()
+            uvicorn_server.should_exit = True
+            thread.join(timeout=5)
+            probe.uninstall()
+
+    boards = args.health + args.exercise + args.camera
+    elapsed = (probe.last_apply - probe.first_send) if probe.applied else 0.0
+    results = {
+        "boards": boards,
+        "rate_per_board": args.rate,
+        "offered_msgs_per_s": boards * args.rate,
+        "sent": sent,
+        "applied": probe.applied,
+        "connection_errors": len(errors),
+        "throughput_msgs_per_s": probe.applied / elapsed if elapsed > 0 else 0.0,
+        "latency": percentiles_ms(probe.latencies),
+        "loop_lag": percentiles_ms(lags),
+    }
+
+    print(f"{boards} boards at {args.rate:g} msg/s for {args.duration:g} s "
+          f"({results['offered_msgs_per_s']:g} msg/s offered)")
+    print(f"sent {sent}, applied {probe.applied}, connection errors {len(errors)}")
+    if errors:
+        print(f"first error: {errors[0]!r}")
+    print(f"throughput {results['throughput_msgs_per_s']:.0f} msg/s")
+    for name in ("latency", "loop_lag"):
+        stats = results[name]
+        if stats:
+            print(f"{name:<10} p50 {stats['p50_ms']:8.2f} ms   p95 {stats['p95_ms']:8.2f} ms"
+                  f"   p99 {stats['p99_ms']:8.2f} ms   max {stats['max_ms']:8.2f} ms")
+
+    if args.output:
+        report = {
+            "commit": git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "seed": args.seed,
+            "results": results,
+        }
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=4)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
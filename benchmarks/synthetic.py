@@ -0,0 +1,82 @@
+"""
+Synthetic landmark and pose generators so benchmarks run without cameras or MediaPipe models.
+"""
+import json
+from types import SimpleNamespace
+
+import numpy as np
+
+# A rough standing pose in normalized image coordinates, one (x, y) per MediaPipe landmark
+_BASE_POSE = np.array([
+    (0.50, 0.10), (0.51, 0.09), (0.52, 0.09), (0.53, 0.09), (0.49, 0.09), (0.48, 0.09), (0.47, 0.09),
+    (0.55, 0.10), (0.45, 0.10), (0.51, 0.12), (0.49, 0.12),
+    (0.60, 0.22), (0.40, 0.22), (0.65, 0.35), (0.35, 0.35), (0.67, 0.47), (0.33, 0.47),
+    (0.68, 0.50), (0.32, 0.50), (0.67, 0.50), (0.33, 0.50), (0.66, 0.49), (0.34, 0.49),
+    (0.56, 0.52), (0.44, 0.52), (0.57, 0.70), (0.43, 0.70), (0.57, 0.88), (0.43, 0.88),
+    (0.58, 0.90), (0.42, 0.90), (0.60, 0.92), (0.40, 0.92),
+])
+
+
+def make_landmark_array(rng, jitter=0.05):
+    """Return a 33 x 4 (x, y, z, visibility) float32 array around the base pose"""
+    xy = _BASE_POSE + rng.normal(0, jitter, _BASE_POSE.shape)
+    z = rng.normal(0, 0.05, (33, 1))
+    visibility = rng.uniform(0.7, 1.0, (33, 1))
+    return np.hstack([xy, z, visibility]).astype(np.float32)
+
+
+def make_landmarks(rng, jitter=0.05):
+    """Return landmark objects with .x/.y/.z/.visibility like MediaPipe's"""
+    return [SimpleNamespace(x=float(x), y=float(y), z=float(z), visibility=float(v))
+            for x, y, z, v in make_landmark_array(rng, jitter)]
+
+
+def make_pose_library(estimator, count, rng, jitter=0.15):
+    """Build `count` named poses from randomly perturbed synthetic landmarks"""
+    return {f"pose_{i}": estimator.extract_joint_angles(make_landmarks(rng, jitter)) for i in range(count)}
+
+
+def make_health_payload(rng):
+    """Return a JSON health message shaped like the ESP32 firmware sends"""
+    return json.dumps({
+        "heart_rate": int(rng.integers(55, 140)),
+        "spo2": int(rng.integers(92, 100)),
+        "body_temp_pre": round(float(rng.uniform(36.0, 37.5)), 2),
+        "body_temp_post": round(float(rng.uniform(36.0, 38.0)), 2),
+        "ir_value": int(rng.integers(40000, 120000)),
+        "steps": int(rng.integers(0, 5000)),
+        "strength_count": int(rng.integers(0, 200)),
+        "max30102_status": "ok",
+        "mpu6050_status": "ok",
+        "mlx90614_status": "ok",
+    })
+
+
+def make_exercise_payload(rng, steps=0):
+    """Return a JSON exercise message like the MPU6050 board sends, counting up from `steps`"""
+    return json.dumps({
+        "steps": int(steps),
+        "strength_count": int(steps // 25),
+    })
+
+
+def make_camera_payload(rng):
+    """Return a JSON status message like the ESP32-S3 camera sends"""
+    return json.dumps({"camera_status": "streaming" if rng.random() < 0.95 else "connected"})
+
+
+def make_ppg_samples(rng, count, start=0, heart_rate=72.0, spo2=97.0, sample_rate=100):
+    """
+    Return (ir, red) arrays of raw MAX30102-like samples from sample index `start`:
+    a pulse wave at heart_rate on a drifting DC level, with red/IR amplitudes
+    chosen so the ratio of ratios maps back to spo2 on Maxim's calibration curve.
+    """
+    t = (start + np.arange(count)) / sample_rate
+    phase = 2 * np.pi * heart_rate / 60 * t
+    pulse = np.sin(phase) + 0.4 * np.sin(2 * phase + 0.8)  # Systolic peak plus dicrotic notch
+    ratio = (30.354 + np.sqrt(30.354 ** 2 - 4 * 45.060 * (spo2 - 94.845))) / (2 * 45.060)
+    drift = 1 + 0.01 * np.sin(2 * np.pi * 0.1 * t)  # Breathing / pressure baseline wander
+    ir_dc, red_dc, ir_ac = 100000.0, 80000.0, 0.01
+    ir = ir_dc * drift * (1 + ir_ac * pulse) + rng.normal(0, 100, count)
+    red = red_dc * drift * (1 + ratio * ir_ac * pulse) + rng.normal(0, 100, count)
+    return ir, red
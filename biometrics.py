@@ -0,0 +1,107 @@
+from PyQt6.QtCore import QObject, pyqtSignal
+
+DEFAULT_AGE = 19
+DEFAULT_HEIGHT_CM = 170  # Used for calorie estimates when no height is entered
+
+# (upper bound, category); the last category has no upper bound
+BMI_CATEGORIES = [(18.5, "Underweight"), (25, "Normal"), (30, "Overweight"), (None, "Obese")]
+
+
+def parse_positive(text):
+    """Float value of an input field, or None if it is empty, not a number or not positive"""
+    try:
+        value = float(text)
+    except (TypeError, ValueError):
+        return None
+    return value if value > 0 else None
+
+
+def bmi_category(bmi):
+    for upper, category in BMI_CATEGORIES:
+        if upper is None or bmi < upper:
+            return category
+
+
+class BiometricsModel(QObject):
+    """
+    Weight, height, age and gender, parsed once when they change.
+
+    The weight/height fields feed set_weight_text/set_height_text (connect
+    them to textChanged) and the saved profile feeds set_profile. Derived
+    values - BMI, its category, the BMI used for calorie estimates and the
+    Keytel coefficients - are recomputed right away and cached, and
+    `changed` is emitted only when one of them actually differs, so the
+    periodic UI updates just read attributes.
+    """
+    changed = pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.weight_text = ""
+        self.height_text = ""
+        self.age = DEFAULT_AGE
+        self.gender = ""
+        self._derive()
+
+    def set_weight_text(self, text):
+        if text != self.weight_text:
+            self.weight_text = text
+            self._update()
+
+    def set_height_text(self, text):
+        if text != self.height_text:
+            self.height_text = text
+            self._update()
+
+    def set_profile(self, profile):
+        """Take age and gender from the profile (missing or invalid age means the default)"""
+        try:
+            age = int(profile.get("age") or DEFAULT_AGE)
+        except (TypeError, ValueError):
+            age = DEFAULT_AGE
+        gender = profile.get("gender") or ""
+        if (age, gender) != (self.age, self.gender):
+            self.age = age
+            self.gender = gender
+            self._update()
+
+    def _update(self):
+        previous = self.state()
+        self._derive()
+        if self.state() != previous:
+            self.changed.emit()
+
+    def _derive(self):
+        self.weight = parse_positive(self.weight_text)
+        self.height_cm = parse_positive(self.height_text)
+        self.bmi = None
+        self.category = None
+        self.estimate_bmi = None
+        self.keytel = None
+        if self.weight is None:
+            return
+        if self.height_cm is not None:
+            self.bmi = self.weight / (self.height_cm / 100) ** 2
+            self.category = bmi_category(self.bmi)
+        height_m = (self.height_cm or DEFAULT_HEIGHT_CM) / 100
+        self.estimate_bmi = self.weight / (height_m * height_m)
+
+        # Keytel equation (2005) folded into kcal/min = intercept + slope * heart rate;
+        # anything but "Female" uses the male coefficients, as the app always has
+        if self.gender == "Female":
+            intercept = 0.074 * self.age + 0.1263 * self.weight - 20.4022
+            slope = 0.4472
+        else:
+            intercept = 0.2017 * self.age + 0.1988 * self.weight - 55.0969
+            slope = 0.6309
+        self.keytel = (intercept / 4.184, slope / 4.184)
+
+    def state(self):
+        return (self.weight, self.height_cm, self.bmi, self.category, self.estimate_bmi, self.keytel)
+
+    def keytel_calories(self, heart_rate, minutes):
+        """Calories over `minutes` at `heart_rate` from the cached Keytel coefficients (None without a weight)"""
+        if self.keytel is None:
+            return None
+        intercept, slope = self.keytel
+        return minutes * (intercept + slope * heart_rate)
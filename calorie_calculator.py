@@ -1,3 +1,117 @@
+import re
+from functools import lru_cache
+import numpy as np
+
+# Common yoga poses (or keywords in their names) and their intensities.
+# User poses go through register_pose_intensity() instead, which matches
+# them by exact name only and keeps the lookup cache in sync.
+POSE_INTENSITIES = {
+    # Light intensity poses
+    "mountain pose": "light",
+    "child's pose": "light",
+    "corpse pose": "light",
+    "easy pose": "light",
+    "seated forward bend": "light",
+    "mountain": "light",
+    "child": "light",
+    "corpse": "light",
+    "easy": "light",
+    "seated": "light",
+    
+    # Moderate intensity poses
+    "downward dog": "moderate",
+    "warrior i": "moderate",
+    "warrior ii": "moderate",
+    "triangle pose": "moderate",
+    "tree pose": "moderate",
+    "warrior": "moderate",
+    "triangle": "moderate",
+    "tree": "moderate",
+    "twist": "moderate",
+    
+    # High intensity poses
+    "crow pose": "intense",
+    "handstand": "intense",
+    "headstand": "intense",
+    "wheel pose": "intense",
+    "side plank": "intense",
+    "crow": "intense",
+    "wheel": "intense"
+}
+
+# A name containing keywords of several levels gets the first of these
+INTENSITY_PRIORITY = ["intense", "moderate", "light"]
+
+# User-registered intensities and MET values, keyed by lower-case pose name
+CUSTOM_POSE_INTENSITIES = {}
+CUSTOM_POSE_METS = {}
+
+_pose_patterns = None
+
+
+def _compile_pose_patterns():
+    """Compile the keys of each intensity level into one alternation regex, in priority order"""
+    global _pose_patterns
+    _pose_patterns = []
+    for intensity in INTENSITY_PRIORITY:
+        keys = [key for key, level in POSE_INTENSITIES.items() if level == intensity]
+        _pose_patterns.append((intensity, re.compile("|".join(re.escape(key) for key in keys))))
+    return _pose_patterns
+
+
+@lru_cache(maxsize=256)
+def get_pose_intensity(pose_name):
+    """
+    Look up the intensity level of a yoga pose (memoized per pose name)
+    
+    Returns:
+    - Intensity level: 'light', 'moderate', or 'intense'
+    """
+    pose_lower = pose_name.lower()
+    
+    # Exact matches take priority; user-registered poses only ever match exactly
+    if pose_lower in CUSTOM_POSE_INTENSITIES:
+        return CUSTOM_POSE_INTENSITIES[pose_lower]
+    if pose_lower in POSE_INTENSITIES:
+        return POSE_INTENSITIES[pose_lower]
+    
+    # Otherwise any intense keyword wins over a moderate one, and that over a light one
+    for intensity, pattern in _pose_patterns or _compile_pose_patterns():
+        if pattern.search(pose_lower):
+            return intensity
+    
+    # Default to moderate if pose not found
+    return "moderate"
+
+
+def get_custom_pose_met(pose_name):
+    """Return the user-attached MET value for a pose, or None"""
+    return CUSTOM_POSE_METS.get(pose_name.lower())
+
+
+def register_pose_intensity(pose_name, intensity=None, met=None):
+    """
+    Set the intensity and MET value of one user pose, matched by exact name
+    
+    Parameters:
+    - pose_name: Name of the yoga pose
+    - intensity: 'light', 'moderate', 'intense', or None to keep the keyword-based intensity
+    - met: Optional MET value to use for this pose instead of the intensity default
+    """
+    pose_lower = pose_name.lower()
+    if intensity is not None:
+        CUSTOM_POSE_INTENSITIES[pose_lower] = intensity
+    else:
+        CUSTOM_POSE_INTENSITIES.pop(pose_lower, None)
+    if met is not None:
+        CUSTOM_POSE_METS[pose_lower] = float(met)
+    else:
+        CUSTOM_POSE_METS.pop(pose_lower, None)
+    
+    # Drop results cached before the change
+    get_pose_intensity.cache_clear()
+
+
 class CalorieCalculator:
     def __init__(self):
         # MET values for different yoga intensities
@@ -72,6 +186,68 @@ class CalorieCalculator:
         
         return calories
     
+    def calculate_calories_from_heart_rate_batch(self, heart_rates, weight_kg, age, gender, duration_minutes):
+        """
+        Vectorized Keytel calculation over many heart rate samples at once
+        
+        Parameters:
+        - heart_rates: Array of heart rate samples (BPM)
+        - weight_kg: Weight in kilograms (scalar or array broadcastable to heart_rates)
+        - age: Age in years (scalar or array)
+        - gender: 'male'/'female' (scalar or array of strings)
+        - duration_minutes: Duration covered by each sample in minutes (scalar or array)
+        
+        Returns:
+        - (per_sample, cumulative) arrays of calories burned
+        """
+        heart_rates = np.asarray(heart_rates, dtype=np.float64)
+        weight_kg = np.asarray(weight_kg, dtype=np.float64)
+        age = np.asarray(age, dtype=np.float64)
+        duration_minutes = np.asarray(duration_minutes, dtype=np.float64)
+        gender_factor = (np.char.lower(np.asarray(gender, dtype=str)) == 'male').astype(np.float64)
+        
+        # Keytel equation (2005), same coefficients as the scalar version
+        male = 0.2017 * age + 0.1988 * weight_kg + 0.6309 * heart_rates - 55.0969
+        female = 0.074 * age + 0.1263 * weight_kg + 0.4472 * heart_rates - 20.4022
+        calories = duration_minutes * (male * gender_factor + female * (1 - gender_factor)) / 4.184
+        
+        # Invalid heart rates count as zero, negative results are clamped
+        valid = (heart_rates >= 40) & (heart_rates <= 220)
+        per_sample = np.atleast_1d(np.where(valid, np.maximum(calories, 0), 0.0))
+        return per_sample, np.cumsum(per_sample, axis=-1)
+    
+    def calculate_calories_from_met_batch(self, weight_kg, duration_hours, yoga_intensities="moderate", body_temps=37.0, bmis=22.0):
+        """
+        Vectorized MET calculation over many samples at once
+        
+        Parameters:
+        - weight_kg: Weight in kilograms (scalar or array)
+        - duration_hours: Duration covered by each sample in hours (scalar or array)
+        - yoga_intensities: Intensity label per sample ('light', 'moderate', 'intense')
+        - body_temps: Body temperature per sample in Celsius
+        - bmis: Body Mass Index per sample
+        
+        Returns:
+        - (per_sample, cumulative) arrays of calories burned
+        """
+        weight_kg = np.asarray(weight_kg, dtype=np.float64)
+        duration_hours = np.asarray(duration_hours, dtype=np.float64)
+        body_temps = np.asarray(body_temps, dtype=np.float64)
+        bmis = np.asarray(bmis, dtype=np.float64)
+        
+        # Look up each distinct label once instead of once per sample
+        labels, inverse = np.unique(np.char.lower(np.asarray(yoga_intensities, dtype=str)), return_inverse=True)
+        label_mets = np.array([self.yoga_met_values.get(label, 3.0) for label in labels])
+        base_met = label_mets[inverse].reshape(np.shape(yoga_intensities))
+        
+        temp_adjustment = 1.0 + np.maximum(0, (body_temps - 37.0) * 0.13)
+        
+        # Same BMI bands as calculate_calories_from_met
+        bmi_adjustment = np.select([bmis < 18.5, bmis < 25, bmis < 30], [0.95, 1.0, 1.05], default=1.1)
+        
+        per_sample = np.atleast_1d(base_met * temp_adjustment * bmi_adjustment * weight_kg * duration_hours)
+        return per_sample, np.cumsum(per_sample, axis=-1)
+    
     def get_yoga_intensity(self, pose_name):
         """
         Determine the intensity level of a yoga pose
@@ -82,35 +258,19 @@ class CalorieCalculator:
         Returns:
         - Intensity level: 'light', 'moderate', or 'intense'
         """
-        # Dictionary of common yoga poses and their intensities
-        pose_intensities = {
-            # Light intensity poses
-            "mountain pose": "light",
-            "child's pose": "light",
-            "corpse pose": "light",
-            "easy pose": "light",
-            "seated forward bend": "light",
-            
-            # Moderate intensity poses
-            "downward dog": "moderate",
-            "warrior i": "moderate",
-            "warrior ii": "moderate",
-            "triangle pose": "moderate",
-            "tree pose": "moderate",
-            
-            # High intensity poses
-            "crow pose": "intense",
-            "handstand": "intense",
-            "headstand": "intense",
-            "wheel pose": "intense",
-            "side plank": "intense"
-        }
+        return get_pose_intensity(pose_name)
+    
+    def get_pose_met(self, pose_name):
+        """
+        Get the MET value for a yoga pose, preferring a user-registered MET
         
-        # Check if the pose is in our dictionary
-        pose_lower = pose_name.lower()
-        for pose_key, intensity in pose_intensities.items():
-            if pose_key in pose_lower:
-                return intensity
-                
-        # Default to moderate if pose not found
-        return "moderate"
+        Parameters:
+        - pose_name: Name of the yoga pose
+        
+        Returns:
+        - MET value
+        """
+        custom_met = get_custom_pose_met(pose_name)
+        if custom_met is not None:
+            return custom_met
+        return self.yoga_met_values.get(get_pose_intensity(pose_name), 3.0)
@@ -1,12 +1,21 @@
 import os
 import cv2
 from datetime import datetime
+from types import SimpleNamespace
 from PyQt6.QtGui import QPixmap, QFont
 from PyQt6.QtWidgets import QWidget, QVBoxLayout, QLabel, QProgressBar, QFrame 
 from PyQt6.QtCore import Qt, pyqtSignal, QUrl, QThread
 import time
 import mediapipe as mp
 from esp32_camera import ESP32CameraReceiver
+from stage_timer import StageTimer
+from pose_estimator import batch_statistics
+from pose_tracker import PoseTracker
+from roi_tracker import ROITracker
+from performance_profiles import PERFORMANCE_PROFILES, AutoProfileSelector
+from multi_person import MultiPersonPoseEstimator
+from inference_backend import ProcessInferenceBackend
+from hud_overlay import OverlayCompositor
 
 class CameraThread(QThread):
     # Define signals for thread-safe communication
@@ -15,6 +24,9 @@ class CameraThread(QThread):
     model_updated = pyqtSignal()
     pose_count_updated = pyqtSignal(int)  # New signal for pose count
     camera_error = pyqtSignal(str)
+    stage_timings_updated = pyqtSignal(dict)  # Rolling per-stage latency percentiles
+    profile_changed = pyqtSignal(str)  # Active performance profile (also on auto switches)
+    person_accuracy_updated = pyqtSignal(int, float, str)  # person id, accuracy, pose (multi-person mode)
     def __init__(self, pose_estimator):
         super().__init__()
         self.estimator = pose_estimator
@@ -34,20 +46,41 @@ class CameraThread(QThread):
         self.low_accuracy_feedback_count = 0
         self.medium_accuracy_feedback_count = 0
         self.last_accuracy_level = "high"  # Track the last accuracy level
+        self.session_recorder = None  # Optional SessionRecorder for per-frame logging
+        self.replay_source = None  # Optional ReplayFrameSource used instead of a camera
+        self.headless = False  # Skip the OpenCV window (e.g. benchmarking on a build box)
+        # Per-stage latency tracking; disabled unless YOGKALP_PROFILE=1 or enabled at runtime
+        self.stage_timer = StageTimer(enabled=os.getenv("YOGKALP_PROFILE") == "1")
+        self.timing_overlay = False  # Draw stage latencies on the frame ('D' toggles)
+        self.last_timings_emit = 0
+        # Smooths landmarks/scores and rate-limits accuracy_updated
+        self.pose_tracker = PoseTracker(self.estimator)
+        # Crop/downsize MediaPipe input around the previous frame's landmarks
+        self.roi_tracker = ROITracker()
+        self.use_roi = False  # Opt-in; see set_roi_enabled
+        # Performance profile: model complexity, hands, input resolution and frame stride
+        self.active_profile = self.estimator.profile
+        self.pending_profile = None  # Requested profile or "auto", applied by the camera loop between frames
+        self.auto_profile = None  # AutoProfileSelector when in auto mode (camera thread only)
+        self.frame_stride = PERFORMANCE_PROFILES[self.active_profile]["frame_stride"]
+        self.roi_tracker.max_side = PERFORMANCE_PROFILES[self.active_profile]["max_side"]
+        self.frame_index = 0
+        self.multi_person = None  # MultiPersonPoseEstimator when tracking several people
+        self.pending_multi_person = None  # (enabled, model_path, max_people), applied by the camera loop between frames
+        self.inference_backend = None  # ProcessInferenceBackend when inference runs out of process
+        self.hud = OverlayCompositor()  # Cached static HUD layer
         
     def set_pose_name(self, name):
         self.current_pose_name = name
         
     def save_current_batch(self, name):
-        """Average the angles in the current batch and save as a named pose"""
+        """Average the angles in the current batch and save as a named pose with its statistics"""
         if self.current_batch:
-            # Calculate average angles for each joint
-            avg_angles = {}
-            for key in self.current_batch[0].keys():
-                avg_angles[key] = sum(batch[key] for batch in self.current_batch) / len(self.current_batch)
+            # Mean, spread and per-joint tolerance of each feature over the whole batch
+            stats = batch_statistics(self.current_batch)
             
             # Save to estimator
-            self.estimator.add_named_pose(name, avg_angles)
+            self.estimator.add_named_pose(name, stats["mean"], stats)
             # Reset batch
             self.current_batch = []
             
@@ -62,6 +95,112 @@ class CameraThread(QThread):
         """Enable or disable palm detection feature"""
         self.palm_detection_enabled = enabled
     
+    def set_session_recorder(self, recorder):
+        """Attach (or detach with None) a SessionRecorder that logs every analysed frame"""
+        self.session_recorder = recorder
+    
+    def set_replay_source(self, source):
+        """Replay a video, image directory or recorded landmark stream instead of a camera"""
+        self.replay_source = source
+        
+    def set_headless(self, enabled):
+        """Run without the OpenCV preview window"""
+        self.headless = enabled
+    
+    def set_instrumentation_enabled(self, enabled):
+        """Enable or disable per-stage latency tracking"""
+        self.stage_timer.set_enabled(enabled)
+        
+    def set_timing_overlay_enabled(self, enabled):
+        """Show or hide the stage latency overlay on the video frame"""
+        self.timing_overlay = enabled
+        
+    def draw_timing_overlay(self, image, timings):
+        """Draw p50/p95 latency per stage in the top-left corner"""
+        y = 80
+        for stage, stats in timings.items():
+            cv2.putText(image, f"{stage}: {stats['p50_ms']:.1f} / {stats['p95_ms']:.1f} ms", (20, y),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.45, (0, 255, 255), 1)
+            y += 18
+    
+    def set_roi_enabled(self, enabled):
+        """Enable or disable region-of-interest cropping before inference"""
+        self.use_roi = enabled
+        self.roi_tracker.reset()
+    
+    def set_performance_profile(self, name):
+        """Switch to 'eco', 'balanced', 'precise' or 'auto' without restarting the thread"""
+        if name == "auto" or name in PERFORMANCE_PROFILES:
+            self.pending_profile = name
+        else:
+            print(f"Unknown performance profile: {name}")
+            
+    def apply_performance_profile(self, name):
+        """Reload models and pipeline settings for a profile (called from the camera loop)"""
+        settings = PERFORMANCE_PROFILES[name]
+        if self.estimator.pose is not None and self.estimator.profile != name:
+            self.estimator.load_models(name)
+        if self.inference_backend is not None and self.inference_backend.profile != name:
+            self.set_process_inference_enabled(False)
+            self.set_process_inference_enabled(True, name)
+        self.roi_tracker.max_side = settings["max_side"]
+        self.roi_tracker.reset()
+        self.frame_stride = settings["frame_stride"]
+        self.active_profile = name
+        self.profile_changed.emit(name)
+    
+    def set_process_inference_enabled(self, enabled, profile=None):
+        """Run pose and hand inference in a worker process instead of this thread"""
+        if self.inference_backend is not None:
+            self.inference_backend.close()
+            self.inference_backend = None
+        if enabled:
+            try:
+                self.inference_backend = ProcessInferenceBackend(profile or self.active_profile)
+                self.inference_backend.start()
+            except Exception as e:
+                print(f"Error starting inference process: {e}")
+                self.inference_backend = None
+    
+    def set_multi_person_enabled(self, enabled, model_path=None, max_people=4):
+        """Track and score several people per frame (needs a MediaPipe pose landmarker .task model)"""
+        self.pending_multi_person = (enabled, model_path, max_people)
+    
+    def apply_multi_person(self, enabled, model_path=None, max_people=4):
+        """Create or close the multi-person estimator (called from the camera loop)"""
+        if self.multi_person is not None:
+            self.multi_person.close()
+            self.multi_person = None
+        if enabled:
+            try:
+                if model_path:
+                    self.multi_person = MultiPersonPoseEstimator(self.estimator, model_path, max_people)
+                else:
+                    self.multi_person = MultiPersonPoseEstimator(self.estimator, max_people=max_people)
+            except Exception as e:
+                print(f"Error enabling multi-person tracking: {e}")
+                self.camera_error.emit("Multi-person tracking not available. Check the pose landmarker model file.")
+    
+    def draw_people(self, image, people):
+        """Draw every tracked person's skeleton with their ID and matched pose"""
+        h, w = image.shape[:2]
+        for person in people:
+            points = [(int(x * w), int(y * h)) for x, y in person["landmarks"][:, :2]]
+            visible = person["landmarks"][:, 3] > 0.5
+            for start, end in self.estimator.mp_pose.POSE_CONNECTIONS:
+                if visible[start] and visible[end]:
+                    cv2.line(image, points[start], points[end], (26, 115, 232), 2)
+            for point, is_visible in zip(points, visible):
+                if is_visible:
+                    cv2.circle(image, point, 2, (232, 115, 26), -1)
+            
+            label = f"#{person['person_id']}"
+            if person["pose"] is not None:
+                label += f" {person['pose']} {person['accuracy']:.0f}%"
+            top = min(points[11][1], points[12][1])
+            cv2.putText(image, label, (points[0][0] - 40, max(75, top - 20)),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
+    
     def set_esp32_cam_enabled(self, enabled, url=None):
         
         """Enable or disable ESP32-CAM stream"""
@@ -80,12 +219,38 @@ class CameraThread(QThread):
         cap = None
         
         # Create modern-looking window
-        cv2.namedWindow("Yoga Pose Analysis", cv2.WINDOW_NORMAL)
-        cv2.resizeWindow("Yoga Pose Analysis", 640, 480)
+        if not self.headless:
+            cv2.namedWindow("Yoga Pose Analysis", cv2.WINDOW_NORMAL)
+            cv2.resizeWindow("Yoga Pose Analysis", 640, 480)
+        
+        timer = self.stage_timer
+        
+        results_pose = None
+        people = []  # Tracked people in multi-person mode
+        angles = None  # Joint angles and visibility of the last analysed frame
+        full_body_visible = False
         
         while self.running:
+            timer.begin()
+            
+            # Switch profile between frames so models are never swapped mid-inference
+            if self.pending_profile is not None:
+                profile, self.pending_profile = self.pending_profile, None
+                if profile == "auto":
+                    self.auto_profile = AutoProfileSelector(start=self.active_profile)
+                else:
+                    self.auto_profile = None
+                    self.apply_performance_profile(profile)
+            # Likewise the multi-person estimator is only created and closed while it is idle
+            if self.pending_multi_person is not None:
+                request, self.pending_multi_person = self.pending_multi_person, None
+                self.apply_multi_person(*request)
+                people = []
+            
             # Try to initialize or check camera if not already done
-            if self.use_esp32_cam and (not hasattr(self, 'esp32_cam_initialized') or not self.esp32_cam_initialized):
+            if self.replay_source is not None:
+                pass  # Replay sources need no connection handling
+            elif self.use_esp32_cam and (not hasattr(self, 'esp32_cam_initialized') or not self.esp32_cam_initialized):
                 # Try to connect to ESP32-CAM
                 print("Attempting to connect to YogKalp-CAM...")
                 if not self.esp32_cam.connect():
@@ -113,7 +278,12 @@ class CameraThread(QThread):
                     continue
             
             # Get frame from appropriate source
-            if self.use_esp32_cam:
+            if self.replay_source is not None:
+                ret, frame = self.replay_source.read_frame()
+                if not ret:
+                    print("Replay finished")
+                    break
+            elif self.use_esp32_cam:
                 ret, frame = self.esp32_cam.read_frame()
                 if not ret:
                     print("Failed to get frame from YogKalp-CAM")
@@ -132,38 +302,96 @@ class CameraThread(QThread):
                     time.sleep(1)
                     continue
             
-            # Process image for pose detection
-            image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            results_pose = self.estimator.pose.process(image)
-            
-            # Process image for hand detection (for gesture control)
-            results_hands = self.estimator.hands.process(image)
+            timer.lap("capture")
+            processing_start = time.perf_counter()
             
-            image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
+            # With a frame stride > 1, inference only runs on every Nth frame
+            # (recorded landmarks need no inference, so every replayed frame is fresh)
+            self.frame_index += 1
+            replaying_landmarks = self.replay_source is not None and self.replay_source.provides_landmarks
+            skip_inference = (self.frame_stride > 1 and self.frame_index % self.frame_stride != 0
+                              and results_pose is not None and not replaying_landmarks)
             
-            # Add fancy header
-            cv2.rectangle(image, (0, 0), (image.shape[1], 60), (26, 115, 232), -1)
-            cv2.putText(image, "Yoga Pose Analysis", (20, 40), 
-                         cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
-                        
-            # Add camera source indicator
-            source_text = "ESP32-CAM" if self.use_esp32_cam else "Local Camera"
-            cv2.putText(image, f"Source: {source_text}", (image.shape[1]-250, 80), 
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.6, (26, 115, 232), 2)
-            
-            # Add training images count
-            cv2.putText(image, f"Training Images: {self.training_images_count}", 
-                        (image.shape[1] - 250, 40), 
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+            if replaying_landmarks:
+                # Recorded landmarks: skip MediaPipe so only the matching stages are measured
+                results_pose = SimpleNamespace(pose_landmarks=self.replay_source.landmarks)
+                results_hands = None
+                image = frame
+            elif self.multi_person is not None and not skip_inference:
+                # Detect everyone in the full frame; features and matching run batched for all of them
+                people = self.multi_person.process(frame)
+                timer.lap("pose.process")
+                for person in people:
+                    if person["emit"]:
+                        self.person_accuracy_updated.emit(person["person_id"], person["accuracy"], person["pose"])
+                timer.lap("matching")
+                
+                # Process image for hand detection (for gesture control)
+                results_hands = self.estimator.hands.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+                timer.lap("hands.process")
+                # No single-person landmarks, so the single-person path below is skipped
+                results_pose = SimpleNamespace(pose_landmarks=None)
+                image = frame.copy()
+            elif skip_inference:
+                # Reuse the previous frame's (already full-frame) landmarks
+                results_hands = None
+                image = frame.copy()
+            elif self.inference_backend is not None:
+                # Pose and hands run in the worker process; this thread only waits on the result queue
+                if self.use_roi:
+                    roi_image, roi = self.roi_tracker.crop(frame)
+                else:
+                    roi_image, roi = frame, None
+                try:
+                    results_pose, results_hands = self.inference_backend.process(roi_image)
+                except RuntimeError as e:
+                    # The worker keeps dying; say so and run inference on this thread from now on
+                    print(f"Error in inference process: {e}")
+                    self.camera_error.emit("Inference process stopped working. Running pose detection in the app instead.")
+                    self.set_process_inference_enabled(False)
+                    results_pose, results_hands = SimpleNamespace(pose_landmarks=None), None
+                timer.lap("inference_process")
+                if roi is not None:
+                    self.roi_tracker.map_results(results_pose, results_hands, roi)
+                image = frame.copy()
+                timer.lap("roi_map")
+            elif self.use_roi:
+                # Only convert and analyse the tracked region (full frame when tracking is lost)
+                roi_image, roi = self.roi_tracker.crop(frame)
+                rgb_image = cv2.cvtColor(roi_image, cv2.COLOR_BGR2RGB)
+                timer.lap("cvtColor_rgb")
+                results_pose = self.estimator.pose.process(rgb_image)
+                timer.lap("pose.process")
+                
+                # Process image for hand detection (for gesture control)
+                results_hands = self.estimator.hands.process(rgb_image)
+                timer.lap("hands.process")
+                
+                # Map landmarks back to full-frame coordinates for features and drawing
+                self.roi_tracker.map_results(results_pose, results_hands, roi)
+                image = frame.copy()
+                timer.lap("roi_map")
+            else:
+                # Process image for pose detection
+                image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+                timer.lap("cvtColor_rgb")
+                results_pose = self.estimator.pose.process(image)
+                timer.lap("pose.process")
+                
+                # Process image for hand detection (for gesture control)
+                results_hands = self.estimator.hands.process(image)
+                timer.lap("hands.process")
+                
+                image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
+                timer.lap("cvtColor_bgr")
             
-            # Add instructions for training image capture
-            instruction_text = "Press 'T' to capture training image"
-            if self.palm_detection_enabled:
-                instruction_text += " or show open palm to start 5s timer"
+            # Header, source, training count and instructions come from a cached layer
+            # (nothing is shown in headless mode, so skip it there)
+            if not self.headless:
+                source_text = "ESP32-CAM" if self.use_esp32_cam else "Local Camera"
+                self.hud.compose(image, source_text, self.training_images_count, self.palm_detection_enabled)
             
-            cv2.putText(image, instruction_text, 
-                        (20, image.shape[0] - 20), 
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.5, (26, 115, 232), 2)
+            timer.lap("hud")
             
             # Check for open palm gesture - only if timer is not already active AND palm detection is enabled
             if not self.timer_active and self.palm_detection_enabled and results_hands and results_hands.multi_hand_landmarks:
@@ -200,11 +428,12 @@ class CameraThread(QThread):
                         self.training_count_updated.emit(self.training_images_count)
                         
                         # Show feedback that image was saved
-                        save_feedback = frame.copy()  # Using current frame for feedback
-                        cv2.putText(save_feedback, "Image Saved!", (frame.shape[1]//2 - 100, frame.shape[0]//2), 
-                                   cv2.FONT_HERSHEY_SIMPLEX, 1.5, (0, 255, 0), 3)
-                        cv2.imshow("Yoga Pose Analysis", save_feedback)
-                        cv2.waitKey(500)  # Show feedback for half a second
+                        if not self.headless:
+                            save_feedback = frame.copy()  # Using current frame for feedback
+                            cv2.putText(save_feedback, "Image Saved!", (frame.shape[1]//2 - 100, frame.shape[0]//2), 
+                                       cv2.FONT_HERSHEY_SIMPLEX, 1.5, (0, 255, 0), 3)
+                            cv2.imshow("Yoga Pose Analysis", save_feedback)
+                            cv2.waitKey(500)  # Show feedback for half a second
                         
                         self.image_captured = True
                     
@@ -212,38 +441,49 @@ class CameraThread(QThread):
                     self.palm_detected_time = None
                     self.timer_active = False  # Reset timer active flag
             
+            timer.lap("gestures")
+            
             # In the CameraThread's run method, update the pose detection logic
             # Find the section where it processes pose landmarks and emits accuracy
 
+            if self.multi_person is not None:
+                self.draw_people(image, people)
+                timer.lap("draw_landmarks")
+            
             # Draw pose landmarks with custom style
             if results_pose.pose_landmarks:
                 mp_drawing = mp.solutions.drawing_utils
                 mp_drawing_styles = mp.solutions.drawing_styles
                 
-                # Extract joint angles
-                angles = self.estimator.extract_joint_angles(results_pose.pose_landmarks.landmark)
-                
-                # Check if full body is visible before calculating accuracy
-                full_body_visible = self.estimator.is_full_body_visible(results_pose.pose_landmarks.landmark)
-                
-                # Find the best matching pose from all trained poses
-                best_pose = None
-                best_accuracy = 0
-                
-                # Only proceed with pose matching if full body is visible
-                if full_body_visible:
-                    for pose_name, pose_angles in self.estimator.named_poses.items():
-                        # Calculate accuracy for this pose
-                        accuracy = self.estimator.calculate_pose_accuracy(angles, pose_name)
+                # A stride-skipped frame only redraws the last landmarks; they were already
+                # smoothed, matched and recorded when they were detected
+                if not skip_inference:
+                    # Extract joint angles from temporally smoothed landmarks
+                    smoothed = self.pose_tracker.smooth_landmarks(results_pose.pose_landmarks.landmark)
+                    angles = self.estimator.extract_joint_angles(smoothed)
+                    
+                    # Check if full body is visible before calculating accuracy
+                    full_body_visible = self.estimator.is_full_body_visible(results_pose.pose_landmarks.landmark)
+                    timer.lap("extract_joint_angles")
+                    
+                    # Find the best matching pose from all trained poses
+                    best_pose = None
+                    best_accuracy = 0
+                    
+                    # Only proceed with pose matching if full body is visible
+                    if full_body_visible:
+                        best_pose, best_accuracy, changed = self.pose_tracker.update(angles)
                         
-                        # If this is the best match so far, update
-                        if accuracy > best_accuracy:
-                            best_accuracy = accuracy
-                            best_pose = pose_name
+                        # Only signal the UI on meaningful, rate-limited changes of the stable pose
+                        if changed:
+                            self.accuracy_updated.emit(best_accuracy, best_pose)
+                    
+                    timer.lap("matching")
                     
-                    # If we found a good match, emit the signal with the best pose
-                    if best_pose and best_accuracy > 40:  # Threshold to avoid false positives
-                        self.accuracy_updated.emit(best_accuracy, best_pose)
+                    # Log the frame off the hot path (conversion happens in the writer thread)
+                    if self.session_recorder is not None:
+                        self.session_recorder.record_frame(results_pose.pose_landmarks.landmark, angles,
+                                                           best_pose, best_accuracy)
                 
                 # Draw skeleton in Google blue color
                 mp_drawing.draw_landmarks(
@@ -281,14 +521,45 @@ class CameraThread(QThread):
                                 (20, image.shape[0] - 50), 
                                 cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 0, 255), 2)
             
+                timer.lap("draw_landmarks")
+            elif self.multi_person is None and not skip_inference:
+                # No landmarks: a short dropout keeps the smoothing, a longer absence starts afresh
+                self.pose_tracker.missing()
+            
+            if timer.enabled:
+                timings = timer.summary() if self.timing_overlay else None
+                if timings:
+                    self.draw_timing_overlay(image, timings)
+                # Publish percentiles at most once per second
+                if time.time() - self.last_timings_emit >= 1.0:
+                    self.last_timings_emit = time.time()
+                    self.stage_timings_updated.emit(timings or timer.summary())
+            
+            # Let auto mode pick a profile from the measured processing time; only this
+            # thread touches auto_profile, and the frame is done, so switch right away
+            if self.auto_profile is not None:
+                profile = self.auto_profile.update(time.perf_counter() - processing_start)
+                if profile != self.active_profile:
+                    self.apply_performance_profile(profile)
+            
             # Display the image
+            if self.headless:
+                timer.end()
+                continue
             cv2.imshow("Yoga Pose Analysis", image)
             
             # Initialize key variable before using it
             key = cv2.waitKey(1) & 0xFF
+            timer.lap("imshow")
+            timer.end()
             
             if key == ord('q'):
                 break
+            elif key == ord('d'):
+                # Toggle the stage latency overlay (enables instrumentation if needed)
+                self.timing_overlay = not self.timing_overlay
+                if self.timing_overlay and not timer.enabled:
+                    timer.set_enabled(True)
             elif key == ord('t'):
                 # Save training image
                 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -312,12 +583,20 @@ class CameraThread(QThread):
                 cv2.waitKey(500)  # Show feedback for half a second
         
         # Clean up resources
-        if self.use_esp32_cam:
+        if self.replay_source is not None:
+            self.replay_source.release()
+        elif self.use_esp32_cam:
             self.esp32_cam.release()
         elif cap is not None:
             cap.release()
             
-        cv2.destroyAllWindows()
+        if self.multi_person is not None:
+            self.multi_person.person_tracker.reset()
+        if self.inference_backend is not None:
+            self.inference_backend.close()
+            self.inference_backend = None
+        if not self.headless:
+            cv2.destroyAllWindows()
         self.running = False
                 
     def stop(self):
@@ -1,10 +1,115 @@
-from PyQt6.QtWidgets import QFrame, QVBoxLayout, QHBoxLayout, QLabel, QWidget, QGraphicsDropShadowEffect
-from PyQt6.QtCore import Qt, pyqtSignal, QSize, QPropertyAnimation, QEasingCurve, QObject, pyqtProperty # Add pyqtProperty
-from PyQt6.QtGui import QFont, QColor, QPainter, QPen, QBrush, QPalette, QPixmap
+import html
+from PyQt6.QtWidgets import QFrame, QVBoxLayout, QHBoxLayout, QLabel, QWidget, QGraphicsScene, QGraphicsPixmapItem, QGraphicsBlurEffect
+from PyQt6.QtCore import Qt, pyqtSignal, QSize, QPropertyAnimation, QEasingCurve, QObject, pyqtProperty, QRect, QRectF # Add pyqtProperty
+from PyQt6.QtGui import QFont, QColor, QPainter, QPen, QBrush, QPalette, QPixmap, QImage
 
-class MetricCard(QFrame):
-    def __init__(self, title, value="--", unit="", icon=None, color = None, parent=None):
+# Pre-blurred shadow nine-patches, one per (radius, blur, color) style
+_shadow_cache = {}
+
+
+def shadow_nine_patch(radius, blur, color):
+    """
+    Return (pixmap, corner) for a blurred rounded-rect shadow.
+
+    The pixmap is just big enough to hold the four blurred corners plus a
+    one-pixel middle, so the blur runs once per style and any card size is
+    drawn by stretching the edges and middle (see draw_nine_patch).
+    """
+    key = (radius, blur, QColor(color).rgba())
+    if key not in _shadow_cache:
+        corner = radius + 2 * blur
+        size = 2 * corner + 1
+        source = QPixmap(size, size)
+        source.fill(Qt.GlobalColor.transparent)
+        painter = QPainter(source)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(QColor(color))
+        painter.drawRoundedRect(QRectF(2 * blur, 2 * blur, size - 4 * blur, size - 4 * blur), radius, radius)
+        painter.end()
+
+        # Blur once offscreen with the same effect the cards used to run every repaint
+        scene = QGraphicsScene()
+        item = QGraphicsPixmapItem(source)
+        effect = QGraphicsBlurEffect()
+        effect.setBlurRadius(blur)
+        effect.setBlurHints(QGraphicsBlurEffect.BlurHint.QualityHint)
+        item.setGraphicsEffect(effect)
+        scene.addItem(item)
+        image = QImage(size, size, QImage.Format.Format_ARGB32_Premultiplied)
+        image.fill(Qt.GlobalColor.transparent)
+        painter = QPainter(image)
+        scene.render(painter, QRectF(0, 0, size, size), QRectF(0, 0, size, size))
+        painter.end()
+        _shadow_cache[key] = (QPixmap.fromImage(image), corner)
+    return _shadow_cache[key]
+
+
+def draw_nine_patch(painter, target, pixmap, corner):
+    """Draw pixmap into target keeping its corner-sized corners and stretching the rest"""
+    size = pixmap.width()
+    middle = size - 2 * corner
+    inner_width = max(0, target.width() - 2 * corner)
+    inner_height = max(0, target.height() - 2 * corner)
+    columns = ((target.left(), 0, corner, corner),
+               (target.left() + corner, corner, inner_width, middle),
+               (target.left() + corner + inner_width, corner + middle, corner, corner))
+    rows = ((target.top(), 0, corner, corner),
+            (target.top() + corner, corner, inner_height, middle),
+            (target.top() + corner + inner_height, corner + middle, corner, corner))
+    for y, source_y, height, source_height in rows:
+        for x, source_x, width, source_width in columns:
+            if width and height:
+                painter.drawPixmap(QRect(x, y, width, height), pixmap,
+                                   QRect(source_x, source_y, source_width, source_height))
+
+
+class ShadowCard(QFrame):
+    """
+    White rounded card with a soft drop shadow.
+
+    Unlike a QGraphicsDropShadowEffect, which re-renders and re-blurs the
+    whole card offscreen whenever any child repaints, the shadow here is a
+    cached nine-patch drawn in paintEvent, so a label update only repaints
+    the label's own rect. The widget reserves room around the card for the
+    shadow; padding is extra space inside the card, like the old
+    stylesheet padding.
+    """
+
+    def __init__(self, parent=None, radius=12, padding=0, background="white", border=None,
+                 blur=8, offset=2, shadow_color=QColor(0, 0, 0, 30)):
         super().__init__(parent)
+        self.radius = radius
+        self.background = QColor(background)
+        self.border = QColor(border) if border else None
+        self.blur = blur
+        self.offset = offset
+        self.shadow_color = QColor(shadow_color)
+        self.shadow_margins = (blur, max(0, blur - offset), blur, blur + offset)
+        left, top, right, bottom = self.shadow_margins
+        self.setContentsMargins(left + padding, top + padding, right + padding, bottom + padding)
+
+    def card_rect(self):
+        left, top, right, bottom = self.shadow_margins
+        return self.rect().adjusted(left, top, -right, -bottom)
+
+    def paintEvent(self, event):
+        card = self.card_rect()
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        pixmap, corner = shadow_nine_patch(self.radius, self.blur, self.shadow_color)
+        shadow = card.translated(0, self.offset).adjusted(-2 * self.blur, -2 * self.blur,
+                                                          2 * self.blur, 2 * self.blur)
+        draw_nine_patch(painter, shadow, pixmap, corner)
+
+        painter.setPen(QPen(self.border, 1) if self.border else Qt.PenStyle.NoPen)
+        painter.setBrush(self.background)
+        painter.drawRoundedRect(QRectF(card).adjusted(0.5, 0.5, -0.5, -0.5), self.radius, self.radius)
+
+
+class MetricCard(ShadowCard):
+    def __init__(self, title, value="--", unit="", icon=None, color = None, parent=None):
+        super().__init__(parent, radius=10, border="#DADCE0")
         self.title = title
         self.value = value
         self.unit = unit
@@ -19,17 +124,6 @@ class MetricCard(QFrame):
         self.setObjectName(f"{self.title.lower().replace(' ', '_')}_card")
         self.setMinimumSize(180, 120)
         self.setMaximumSize(300, 150)
-        self.setStyleSheet("""
-            QFrame {
-                background-color: white;
-                border-radius: 10px;
-                border: 1px solid #DADCE0;
-            }
-        """)
-        
-        # Add shadow effect
-        self.setGraphicsEffect(self.create_shadow_effect())
-        
         # Create layout
         layout = QVBoxLayout(self)
         layout.setContentsMargins(15, 15, 15, 15)
@@ -61,34 +155,35 @@ class MetricCard(QFrame):
         if self.unit:
             unit_label = QLabel(self.unit)
             unit_label.setFont(QFont("Arial", 12))
-            unit_label.setStyleSheet("color: #5F6368;")
+            unit_label.setProperty("role", "muted")
             value_layout.addWidget(unit_label)
             
         value_layout.addStretch()
         layout.addLayout(value_layout)
         
         # Category (initially empty)
-        self.category_label = QLabel(self.category)
+        self.category_label = QLabel()
         self.category_label.setFont(QFont("Arial", 10))
-        self.category_label.setStyleSheet(f"color: {self.category_color};")
+        self.category_label.setTextFormat(Qt.TextFormat.RichText)
+        self.category_label.setText(self.category_html())
         layout.addWidget(self.category_label)
         
     def update_value(self, value):
+        # setText repaints only the label's rect, and only when the text changed
         self.value = value
-        self.value_label.setText(str(value))
+        if self.value_label.text() != str(value):
+            self.value_label.setText(str(value))
         
     def update_category(self, category, color):
+        if (category, color) == (self.category, self.category_color):
+            return
         self.category = category
         self.category_color = color
-        self.category_label.setText(category)
-        self.category_label.setStyleSheet(f"color: {color};")
-        
-    def create_shadow_effect(self):
-        shadow = QGraphicsDropShadowEffect(self)
-        shadow.setBlurRadius(15)
-        shadow.setColor(QColor(0, 0, 0, 30))
-        shadow.setOffset(0, 2)
-        return shadow
+        self.category_label.setText(self.category_html())
+
+    def category_html(self):
+        # Any category color, without a per-label stylesheet to parse and re-polish
+        return f'<span style="color: {self.category_color};">{html.escape(self.category)}</span>'
 
 class ToggleSwitch(QWidget):
     # Signal emitted when the switch is toggled
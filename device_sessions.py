@@ -0,0 +1,107 @@
+import time
+import asyncio
+from collections import deque
+
+DEFAULT_DEVICE_ID = "default"  # Boards that connect without identifying themselves
+HISTORY_SIZE = 600  # Updates kept per device
+SUBSCRIBER_QUEUE_SIZE = 64  # Updates buffered per subscriber before the oldest are dropped
+
+# Values every device starts with, same keys as esp_data
+DEFAULT_VALUES = {
+    "heart_rate": 0,
+    "spo2": 0,
+    "body_temp_pre": 0,
+    "body_temp_post": 0,
+    "steps": 0,
+    "strength_count": 0,
+    "camera_status": "disconnected"
+}
+
+
+class DeviceSession:
+    """
+    Live state of one wearable.
+
+    `latest` is replaced by a new dict on every update rather than changed
+    in place, so readers on other threads (the GUI timer) always see a
+    complete snapshot without taking a lock. `history` keeps the last
+    `history_size` (timestamp, changes) updates. Subscribers are asyncio
+    queues fed with every update; a slow subscriber loses its oldest
+    updates instead of holding up ingest.
+    """
+
+    def __init__(self, device_id, history_size=HISTORY_SIZE):
+        self.device_id = device_id
+        self.latest = dict(DEFAULT_VALUES)
+        self.history = deque(maxlen=history_size)
+        self.subscribers = set()
+        self.connections = 0
+        self.last_seen = None
+        self.ppg = None  # PPGStream once the board streams raw MAX30102 samples
+
+    def apply(self, changes):
+        """Merge changes into a new latest snapshot, record them and notify subscribers"""
+        if not changes:
+            return self.latest
+        now = time.time()
+        latest = dict(self.latest)
+        latest.update(changes)
+        self.latest = latest
+        self.last_seen = now
+        self.history.append((now, changes))
+
+        update = {"device_id": self.device_id, "time": now, "changes": changes}
+        for queue in self.subscribers:
+            if queue.full():
+                queue.get_nowait()  # Drop the oldest update for a subscriber that is behind
+            queue.put_nowait(update)
+        return latest
+
+    def subscribe(self, maxsize=SUBSCRIBER_QUEUE_SIZE):
+        queue = asyncio.Queue(maxsize=maxsize)
+        self.subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue):
+        self.subscribers.discard(queue)
+
+    def recent(self, count=None):
+        """The last `count` (timestamp, changes) updates, oldest first"""
+        history = list(self.history)
+        return history if count is None else history[-count:]
+
+    def info(self):
+        return {"device_id": self.device_id, "connections": self.connections,
+                "last_seen": self.last_seen, "updates": len(self.history)}
+
+
+class DeviceRegistry:
+    """Device sessions keyed by device id, created on first use"""
+
+    def __init__(self, history_size=HISTORY_SIZE):
+        self.history_size = history_size
+        self.sessions = {}
+
+    def get(self, device_id):
+        """The session for device_id, creating it if this device is new"""
+        session = self.sessions.get(device_id)
+        if session is None:
+            session = self.sessions[device_id] = DeviceSession(device_id, self.history_size)
+        return session
+
+    def find(self, device_id):
+        """The session for device_id, or None if the device never connected"""
+        return self.sessions.get(device_id)
+
+    def devices(self):
+        return [session.info() for session in self.sessions.values()]
+
+
+def device_id_for(websocket):
+    """
+    How a device identifies itself on connect: the `device_id` query
+    parameter or an X-Device-Id header. Older firmware sends neither and
+    shares the default device.
+    """
+    device_id = websocket.query_params.get("device_id") or websocket.headers.get("x-device-id")
+    return device_id.strip() if device_id and device_id.strip() else DEFAULT_DEVICE_ID
@@ -0,0 +1,99 @@
+import os
+import json
+
+# Bundled dish catalog and per-condition food benefits
+CATALOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "food_catalog.json")
+
+BMI_BANDS = ["underweight", "normal", "overweight"]
+
+HEALTH_CONDITIONS = ["Diabetes", "High Blood Pressure", "Heart Disease", "Joint Pain/Arthritis"]
+
+MEAL_TYPES = ["breakfast", "main", "snack"]
+
+CALORIE_DENSITIES = ["low", "medium", "high"]
+
+# Dish fields with a precomputed index; list-valued fields index every entry
+INDEXED_FIELDS = ["bmi_band", "conditions", "meal_type", "calorie_density"]
+
+
+def bmi_band(bmi):
+    """Map a BMI value to its catalog band (same thresholds as the recommendations always used)"""
+    if bmi < 18.5:
+        return "underweight"
+    if bmi < 25:
+        return "normal"
+    return "overweight"
+
+
+class FoodCatalog:
+    """
+    Dish catalog with an inverted index per filterable field.
+
+    Each index maps a field value to the ascending ids of the dishes that
+    have it (plus a set for membership tests). A combined query walks the
+    shortest matching id list and keeps the ids present in every other
+    field's set, so it costs O(smallest match) instead of a catalog scan,
+    and results are cached per filter combination. Results come back in
+    catalog order and can be paged with offset/limit.
+    """
+
+    def __init__(self, path=CATALOG_PATH, dishes=None, benefits=None):
+        if dishes is None:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            dishes = data["dishes"]
+            benefits = data.get("benefits", {}) if benefits is None else benefits
+        self.dishes = dishes
+        self.benefits = benefits or {}
+        self.indexes = {field: {} for field in INDEXED_FIELDS}
+        for dish_id, dish in enumerate(self.dishes):
+            for field in INDEXED_FIELDS:
+                values = dish.get(field)
+                for value in (values if isinstance(values, list) else [values]):
+                    self.indexes[field].setdefault(value, []).append(dish_id)
+        self.index_sets = {field: {value: set(ids) for value, ids in index.items()}
+                           for field, index in self.indexes.items()}
+        self._query_cache = {}
+
+    def query_ids(self, bmi_band=None, condition=None, meal_type=None, calorie_density=None):
+        """Ids of the dishes matching every given filter (None means any), in catalog order"""
+        filters = (("bmi_band", bmi_band), ("conditions", condition),
+                   ("meal_type", meal_type), ("calorie_density", calorie_density))
+        key = tuple(value for _, value in filters)
+        ids = self._query_cache.get(key)
+        if ids is None:
+            active = [(field, value) for field, value in filters if value is not None]
+            if not active:
+                ids = list(range(len(self.dishes)))
+            else:
+                postings = sorted(active, key=lambda item: len(self.indexes[item[0]].get(item[1], ())))
+                field, value = postings[0]
+                others = [self.index_sets[f].get(v, set()) for f, v in postings[1:]]
+                ids = [dish_id for dish_id in self.indexes[field].get(value, [])
+                       if all(dish_id in other for other in others)]
+            self._query_cache[key] = ids
+        return ids
+
+    def count(self, **filters):
+        return len(self.query_ids(**filters))
+
+    def query(self, bmi_band=None, condition=None, meal_type=None, calorie_density=None, offset=0, limit=None):
+        """Matching dishes in catalog order, optionally one page of them"""
+        ids = self.query_ids(bmi_band, condition, meal_type, calorie_density)
+        end = len(ids) if limit is None else offset + limit
+        return [self.dishes[dish_id] for dish_id in ids[offset:end]]
+
+    def sections(self, bmi_band=None, condition=None, meal_type=None, calorie_density=None):
+        """Matching dishes grouped by category, in catalog order"""
+        sections = {}
+        for dish in self.query(bmi_band, condition, meal_type, calorie_density):
+            sections.setdefault(dish["category"], []).append(dish)
+        return sections
+
+    def benefits_for(self, health_conditions):
+        """General food benefits followed by those for each given condition, as {title: [benefit, ...]}"""
+        result = {"General": self.benefits.get("General", [])}
+        for condition in health_conditions:
+            if condition in self.benefits and condition != "General":
+                result[condition] = self.benefits[condition]
+        return result
@@ -0,0 +1,260 @@
+from PyQt6.QtCore import Qt, QAbstractListModel, QModelIndex, QRect, QSize, QUrl, QEvent
+from PyQt6.QtGui import QFont, QColor, QPainter, QFontMetrics, QDesktopServices
+from PyQt6.QtWidgets import QStyledItemDelegate, QStyle, QListView, QAbstractItemView, QMessageBox
+from food_catalog import FoodCatalog
+
+# Shared dish card style, created once for every card
+CARD_STYLE = {
+    "background": QColor("#ffffff"),
+    "hover_background": QColor("#f1f3f4"),
+    "header_color": QColor("#1a73e8"),
+    "name_color": QColor("#202124"),
+    "description_color": QColor("#5F6368"),
+    "benefits_color": QColor("#34A853"),
+    "toggle_color": QColor("#2196F3"),
+    "button_color": QColor("#FF0000"),
+    "button_text": QColor("#ffffff"),
+    "radius": 10,
+    "margin": 5,
+    "padding": 15,
+    "spacing": 5,
+    "button_size": QSize(110, 26)
+}
+
+
+class DishListModel(QAbstractListModel):
+    """
+    Rows for a list of dish cards: section headers followed by their dishes.
+
+    Dishes are catalog entries (name, description, benefits, video_link) or
+    generated recommendations (name, link, benefits); the latter show their
+    benefits behind a "Why this dish?" toggle. Catalog queries are loaded a
+    page at a time as the view scrolls (canFetchMore/fetchMore).
+    """
+    PAGE_SIZE = 20
+    RowRole = Qt.ItemDataRole.UserRole + 1
+    ExpandedRole = Qt.ItemDataRole.UserRole + 2
+
+    def __init__(self, catalog=None, parent=None):
+        super().__init__(parent)
+        self.catalog = catalog or FoodCatalog()
+        self.rows = []  # {"kind": "header", "title"} or {"kind": "dish", "dish", "expanded"}
+        self.pending_ids = []  # Catalog ids of the current query not loaded yet
+        self.last_category = None
+
+    def set_sections(self, sections):
+        """Show {section title: [dish, ...]} in order"""
+        self.beginResetModel()
+        self.rows = []
+        self.pending_ids = []
+        for title, dishes in sections.items():
+            if not dishes:
+                continue
+            self.rows.append({"kind": "header", "title": title})
+            self.rows.extend({"kind": "dish", "dish": dish, "expanded": False} for dish in dishes)
+        self.endResetModel()
+
+    def set_filter(self, bmi_band=None, condition=None, meal_type=None, calorie_density=None):
+        """Show the catalog dishes matching the filters (None means any), grouped by category"""
+        self.beginResetModel()
+        self.rows = []
+        self.pending_ids = list(self.catalog.query_ids(bmi_band, condition, meal_type, calorie_density))
+        self.last_category = None
+        self.endResetModel()
+        self.fetchMore(QModelIndex())
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and bool(self.pending_ids)
+
+    def fetchMore(self, parent=QModelIndex()):
+        """Load the next page of the current catalog query"""
+        if parent.isValid() or not self.pending_ids:
+            return
+        page, self.pending_ids = self.pending_ids[:self.PAGE_SIZE], self.pending_ids[self.PAGE_SIZE:]
+        new_rows = []
+        for dish_id in page:
+            dish = self.catalog.dishes[dish_id]
+            if dish["category"] != self.last_category:
+                self.last_category = dish["category"]
+                new_rows.append({"kind": "header", "title": dish["category"]})
+            new_rows.append({"kind": "dish", "dish": dish, "expanded": False})
+        self.beginInsertRows(QModelIndex(), len(self.rows), len(self.rows) + len(new_rows) - 1)
+        self.rows.extend(new_rows)
+        self.endInsertRows()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self.rows[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return row["title"] if row["kind"] == "header" else row["dish"].get("name", "N/A")
+        if role == self.RowRole:
+            return row
+        if role == self.ExpandedRole:
+            return row.get("expanded", False)
+        return None
+
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
+        if index.isValid() and role == self.ExpandedRole and self.rows[index.row()]["kind"] == "dish":
+            self.rows[index.row()]["expanded"] = bool(value)
+            self.dataChanged.emit(index, index, [role])
+            return True
+        return False
+
+    def flags(self, index):
+        return Qt.ItemFlag.ItemIsEnabled if index.isValid() else Qt.ItemFlag.NoItemFlags
+
+
+class DishCardDelegate(QStyledItemDelegate):
+    """
+    Paints dish cards and section headers on demand, so only visible rows
+    cost anything and no per-dish widgets or stylesheets are created.
+    Clicks on the painted "Watch Recipe" button open the link; clicks on
+    "Why this dish?" toggle the benefits.
+    """
+
+    def __init__(self, view):
+        super().__init__(view)
+        self.view = view
+        self.header_font = QFont("Google Sans", 14, QFont.Weight.Medium)
+        self.name_font = QFont("Google Sans", 12, QFont.Weight.Medium)
+        self.text_font = QFont("Google Sans", 10)
+        self.button_font = QFont("Google Sans", 9)
+        self.size_cache = {}  # (id(row), width, expanded) -> height
+
+    def _text_width(self, width):
+        return width - 2 * (CARD_STYLE["margin"] + CARD_STYLE["padding"])
+
+    def _text_blocks(self, dish, expanded):
+        """(text, font, color) blocks shown under the dish name"""
+        blocks = []
+        if dish.get("description"):
+            blocks.append((dish["description"], self.text_font, CARD_STYLE["description_color"]))
+            if dish.get("benefits"):
+                blocks.append((f"Benefits: {dish['benefits']}", self.text_font, CARD_STYLE["benefits_color"]))
+        else:
+            blocks.append(("Hide details" if expanded else "Why this dish?", self.text_font, CARD_STYLE["toggle_color"]))
+            if expanded:
+                blocks.append((dish.get("benefits", "No benefits information available."),
+                               self.text_font, CARD_STYLE["description_color"]))
+        return blocks
+
+    def _block_height(self, text, font, width):
+        flags = Qt.TextFlag.TextWordWrap
+        return QFontMetrics(font).boundingRect(QRect(0, 0, width, 100000), flags, text).height()
+
+    def _layout(self, rect, row):
+        """Rects of the card, name, button and each text block for a dish row"""
+        margin, padding, spacing = CARD_STYLE["margin"], CARD_STYLE["padding"], CARD_STYLE["spacing"]
+        card = rect.adjusted(margin, margin, -margin, -margin)
+        inner = card.adjusted(padding, padding, -padding, -padding)
+        button_size = CARD_STYLE["button_size"]
+        name_height = max(QFontMetrics(self.name_font).height(), button_size.height())
+        button = QRect(inner.right() - button_size.width() + 1, inner.top(), button_size.width(), button_size.height())
+        name = QRect(inner.left(), inner.top(), inner.width() - button_size.width() - spacing, name_height)
+
+        blocks = []
+        y = inner.top() + name_height + spacing
+        for text, font, color in self._text_blocks(row["dish"], row["expanded"]):
+            height = self._block_height(text, font, inner.width())
+            blocks.append((QRect(inner.left(), y, inner.width(), height), text, font, color))
+            y += height + spacing
+        return card, name, button, blocks
+
+    def sizeHint(self, option, index):
+        row = index.data(DishListModel.RowRole)
+        width = self.view.viewport().width()
+        if row["kind"] == "header":
+            return QSize(width, QFontMetrics(self.header_font).height() + 20)
+
+        key = (id(row), width, row["expanded"])
+        height = self.size_cache.get(key)
+        if height is None:
+            margin, padding, spacing = CARD_STYLE["margin"], CARD_STYLE["padding"], CARD_STYLE["spacing"]
+            text_width = self._text_width(width)
+            height = 2 * (margin + padding) + max(QFontMetrics(self.name_font).height(),
+                                                  CARD_STYLE["button_size"].height())
+            for text, font, _ in self._text_blocks(row["dish"], row["expanded"]):
+                height += spacing + self._block_height(text, font, text_width)
+            self.size_cache[key] = height
+        return QSize(width, height)
+
+    def paint(self, painter, option, index):
+        row = index.data(DishListModel.RowRole)
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+
+        if row["kind"] == "header":
+            painter.setFont(self.header_font)
+            painter.setPen(CARD_STYLE["header_color"])
+            painter.drawText(option.rect.adjusted(CARD_STYLE["margin"] + 5, 10, 0, 0),
+                             Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignTop, row["title"])
+            painter.restore()
+            return
+
+        card, name, button, blocks = self._layout(option.rect, row)
+        hovered = option.state & QStyle.StateFlag.State_MouseOver
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(CARD_STYLE["hover_background"] if hovered else CARD_STYLE["background"])
+        painter.drawRoundedRect(card, CARD_STYLE["radius"], CARD_STYLE["radius"])
+
+        painter.setFont(self.name_font)
+        painter.setPen(CARD_STYLE["name_color"])
+        painter.drawText(name, Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter,
+                         row["dish"].get("name", "N/A"))
+
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(CARD_STYLE["button_color"])
+        painter.drawRoundedRect(button, 8, 8)
+        painter.setFont(self.button_font)
+        painter.setPen(CARD_STYLE["button_text"])
+        painter.drawText(button, Qt.AlignmentFlag.AlignCenter, "Watch Recipe")
+
+        for rect, text, font, color in blocks:
+            painter.setFont(font)
+            painter.setPen(color)
+            painter.drawText(rect, Qt.TextFlag.TextWordWrap, text)
+        painter.restore()
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() != QEvent.Type.MouseButtonRelease or event.button() != Qt.MouseButton.LeftButton:
+            return False
+        row = index.data(DishListModel.RowRole)
+        if row["kind"] != "dish":
+            return False
+
+        _, _, button, blocks = self._layout(option.rect, row)
+        position = event.position().toPoint()
+        if button.contains(position):
+            link = row["dish"].get("video_link") or row["dish"].get("link") or "#"
+            if link != "#":
+                QDesktopServices.openUrl(QUrl(link))
+            else:
+                QMessageBox.information(self.view, "No Link", "Recipe link is not available.")
+            return True
+        if not row["dish"].get("description") and blocks and blocks[0][0].contains(position):
+            model.setData(index, not row["expanded"], DishListModel.ExpandedRole)
+            self.sizeHintChanged.emit(index)  # Let the view re-layout the taller/shorter card
+            return True
+        return False
+
+
+def create_dish_list_view(model, parent=None):
+    """A QListView set up to show a DishListModel as cards"""
+    view = QListView(parent)
+    if model.parent() is None:
+        model.setParent(view)  # Keep the model alive as long as the view
+    view.setModel(model)
+    delegate = DishCardDelegate(view)
+    model.modelAboutToBeReset.connect(delegate.size_cache.clear)  # Cached heights belong to the old rows
+    view.setItemDelegate(delegate)
+    view.setMouseTracking(True)  # Hover highlight
+    view.setSelectionMode(QAbstractItemView.SelectionMode.NoSelection)
+    view.setVerticalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
+    view.setResizeMode(QListView.ResizeMode.Adjust)  # Re-wrap text when the width changes
+    view.setFrameShape(QListView.Shape.NoFrame)
+    view.setStyleSheet("QListView { background: transparent; }")
+    return view
@@ -0,0 +1,156 @@
+import os
+import json
+import time
+import threading
+from PyQt6.QtCore import QThread, pyqtSignal
+import google.generativeai as genai
+
+GEMINI_MODEL_NAME = "gemini-2.0-flash"
+CACHE_PATH = "cache/food_recommendations.json"
+CACHE_TTL = 7 * 24 * 3600  # Seconds before cached recommendations are fetched again
+
+# Dish names that suggest a breakfast dish
+BREAKFAST_KEYWORDS = ['poha', 'upma', 'idli', 'dosa', 'paratha', 'oats', 'smoothie']
+
+_model = None
+_model_lock = threading.Lock()
+
+
+def get_gemini_model():
+    """Return the process-wide Gemini model, configuring the client on first use"""
+    global _model
+    with _model_lock:
+        if _model is None:
+            api_key = os.getenv("GEMINI_API_KEY")
+            if not api_key:
+                raise RuntimeError("GEMINI_API_KEY not found in environment variables. "
+                                   "Please set it to receive personalized recommendations.")
+            genai.configure(api_key=api_key)
+            _model = genai.GenerativeModel(GEMINI_MODEL_NAME)
+        return _model
+
+
+def build_prompt(bmi, health_conditions):
+    return (
+        f"Based on a BMI of {bmi:.2f} and health conditions: {', '.join(health_conditions)}, "
+        f"recommend 2 Indian dishes for breakfast and 2 Indian dishes for dinner. "
+        f"For each dish, provide its name, a webpage link for its recipe (preferring popular articles), "
+        f"and a brief explanation of its health benefits relevant to the given BMI and health conditions. "
+        f"Format each dish as: 'Dish Name: [Name] | Web Link: [Link] | Benefits: [Benefits]'. "
+        f"Separate each dish recommendation with a newline."
+        f"Start by finding the dishes in webpages of 'Nisha Madhulika, Sanjeev Kapoor Khazana, Ranveer Brar, Manjula's Kitchen, Kabita's Kitchen, and Hebbars Kitchen'"
+        f"If dishes not found in the mentioned pages, search for the dishes in youtube channel by 'Indian Food Recipes'"
+    )
+
+
+def parse_recommendations(text):
+    """Parse 'Dish Name: .. | Web Link: .. | Benefits: ..' lines into dicts with name, link and benefits"""
+    dishes = []
+    for line in text.split('\n'):
+        if not line.strip():
+            continue
+        parts = {}
+        current_key = None
+        for item in line.split('|'):
+            if ':' in item:
+                key, value = item.split(':', 1)
+                current_key = key.strip().strip('*').strip()
+                parts[current_key] = value.strip().strip('*').strip()  # Drop markdown bold markers
+            elif current_key:
+                parts[current_key] += ' | ' + item.strip()  # Handle cases where benefits might have '|'
+        link = parts.get('Web Link', parts.get('YouTube Link'))
+        if 'Dish Name' in parts and link is not None and 'Benefits' in parts:
+            dishes.append({"name": parts['Dish Name'], "link": link, "benefits": parts['Benefits']})
+    return dishes
+
+
+def split_meals(dishes):
+    """Pick two breakfast and two dinner dishes, using dish-name keywords for breakfast"""
+    breakfast = []
+    dinner = []
+    for dish in dishes:
+        name = dish["name"].lower()
+        if any(keyword in name for keyword in BREAKFAST_KEYWORDS) and len(breakfast) < 2:
+            breakfast.append(dish)
+        elif len(dinner) < 2:
+            dinner.append(dish)
+
+    # Fill up either meal with dishes that were not used yet
+    for meal in (breakfast, dinner):
+        for dish in dishes:
+            if len(meal) >= 2:
+                break
+            if dish not in breakfast and dish not in dinner:
+                meal.append(dish)
+    return {"Breakfast": breakfast[:2], "Dinner": dinner[:2]}
+
+
+class RecommendationCache:
+    """
+    Parsed recommendations on disk, keyed by rounded BMI and the sorted set of
+    health conditions. Entries older than `ttl` seconds count as missing.
+    """
+
+    def __init__(self, path=CACHE_PATH, ttl=CACHE_TTL):
+        self.path = path
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.entries = None  # Loaded lazily
+
+    @staticmethod
+    def make_key(bmi, health_conditions):
+        return f"{round(bmi)}|{','.join(sorted(health_conditions))}"
+
+    def _load(self):
+        if self.entries is None:
+            try:
+                with open(self.path, "r") as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError):
+                self.entries = {}
+        return self.entries
+
+    def get(self, bmi, health_conditions):
+        """Return the cached dishes, or None if missing or expired"""
+        with self.lock:
+            entry = self._load().get(self.make_key(bmi, health_conditions))
+        if entry is None or time.time() - entry["time"] > self.ttl:
+            return None
+        return entry["dishes"]
+
+    def put(self, bmi, health_conditions, dishes):
+        with self.lock:
+            entries = self._load()
+            entries[self.make_key(bmi, health_conditions)] = {"time": time.time(), "dishes": dishes}
+            # Drop expired entries and write atomically so a crash never leaves a partial file
+            now = time.time()
+            self.entries = {key: entry for key, entry in entries.items() if now - entry["time"] <= self.ttl}
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            temp_path = self.path + ".tmp"
+            with open(temp_path, "w") as f:
+                json.dump(self.entries, f)
+            os.replace(temp_path, self.path)
+
+
+class RecommendationWorker(QThread):
+    """Fetches and parses recommendations off the GUI thread, then caches them"""
+    recommendations_ready = pyqtSignal(list)
+    recommendations_failed = pyqtSignal(str)
+
+    def __init__(self, bmi, health_conditions, cache):
+        super().__init__()
+        self.bmi = bmi
+        self.health_conditions = list(health_conditions)
+        self.cache = cache
+
+    def run(self):
+        try:
+            response = get_gemini_model().generate_content(build_prompt(self.bmi, self.health_conditions))
+            dishes = parse_recommendations(response.text)
+        except Exception as e:
+            print(f"Error fetching food recommendations: {e}")
+            self.recommendations_failed.emit(str(e))
+            return
+        if dishes:
+            self.cache.put(self.bmi, self.health_conditions, dishes)
+        self.recommendations_ready.emit(dishes)
@@ -0,0 +1,96 @@
+import cv2
+import numpy as np
+
+HEADER_HEIGHT = 60
+HEADER_COLOR = (26, 115, 232)  # Google blue (BGR)
+
+
+class OverlayCompositor:
+    """
+    Draws the camera window's static HUD from a cached BGRA layer.
+
+    The header bar, title, source label, training count and instruction
+    text only change when their inputs do, so they are rendered once into
+    a transparent layer and re-rendered only when the frame size or one of
+    the inputs changes. Each frame then copies the fully opaque rows (the
+    header bar) as whole slices and alpha-blends each remaining block of
+    HUD content (text below the header) inside its bounding box in one
+    vectorized multiply-add.
+    """
+
+    def __init__(self):
+        self.key = None
+        self.solid_rows = []  # (y0, y1, bgr rows) runs of fully opaque rows
+        self.blend_boxes = []  # (y0, y1, x0, x1, 255 - alpha, premultiplied bgr) per translucent block
+
+    def compose(self, image, source_text, training_count, palm_detection_enabled):
+        """Blend the HUD onto a BGR frame in place, re-rendering the layer if its inputs changed"""
+        key = (image.shape, source_text, training_count, palm_detection_enabled)
+        if key != self.key:
+            self.key = key
+            self._set_layer(self.render(image.shape[:2], source_text, training_count, palm_detection_enabled))
+
+        for y0, y1, rows in self.solid_rows:
+            image[y0:y1] = rows
+        for y0, y1, x0, x1, inverse_alpha, colors in self.blend_boxes:
+            region = image[y0:y1, x0:x1]
+            cv2.add(cv2.multiply(region, inverse_alpha, scale=1 / 255), colors, dst=region)
+
+    def render(self, size, source_text, training_count, palm_detection_enabled):
+        """Render the HUD into an H x W x 4 BGRA layer"""
+        height, width = size
+        instruction_text = "Press 'T' to capture training image"
+        if palm_detection_enabled:
+            instruction_text += " or show open palm to start 5s timer"
+
+        # Colors and coverage are drawn separately so the alpha channel stays exact
+        # however the OpenCV build treats a fourth channel when drawing
+        layer = np.zeros((height, width, 4), dtype=np.uint8)
+        bgr = np.zeros((height, width, 3), dtype=np.uint8)
+        alpha = np.zeros((height, width), dtype=np.uint8)
+        for canvas, opaque in ((bgr, None), (alpha, 255)):
+            # Header bar and title
+            cv2.rectangle(canvas, (0, 0), (width, HEADER_HEIGHT), opaque or HEADER_COLOR, -1)
+            cv2.putText(canvas, "Yoga Pose Analysis", (20, 40),
+                        cv2.FONT_HERSHEY_SIMPLEX, 1, opaque or (255, 255, 255), 2)
+
+            # Camera source indicator
+            cv2.putText(canvas, f"Source: {source_text}", (width - 250, 80),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.6, opaque or HEADER_COLOR, 2)
+
+            # Training images count
+            cv2.putText(canvas, f"Training Images: {training_count}", (width - 250, 40),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.7, opaque or (255, 255, 255), 2)
+
+            # Instructions for training image capture
+            cv2.putText(canvas, instruction_text, (20, height - 20),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.5, opaque or HEADER_COLOR, 2)
+        layer[:, :, :3] = bgr
+        layer[:, :, 3] = alpha
+        return layer
+
+    def _set_layer(self, layer):
+        """Split the layer into runs of opaque rows and bounding boxes of the content to blend"""
+        alpha = layer[:, :, 3]
+        solid = (alpha == 255).all(axis=1)
+        self.solid_rows = [(y0, y1, layer[y0:y1, :, :3].copy()) for y0, y1 in self._runs(solid)]
+
+        # Antialiased text is drawn over black, so its colors are already premultiplied
+        self.blend_boxes = []
+        translucent = alpha.copy()
+        translucent[solid] = 0
+        for y0, y1 in self._runs(translucent.any(axis=1)):
+            columns = np.flatnonzero(translucent[y0:y1].any(axis=0))
+            x0, x1 = int(columns[0]), int(columns[-1]) + 1
+            inverse_alpha = cv2.merge([255 - alpha[y0:y1, x0:x1]] * 3)
+            self.blend_boxes.append((y0, y1, x0, x1, inverse_alpha, layer[y0:y1, x0:x1, :3].copy()))
+
+    def _runs(self, flags):
+        """Return (start, end) pairs of consecutive True entries"""
+        indices = np.flatnonzero(flags)
+        if not len(indices):
+            return []
+        breaks = np.flatnonzero(np.diff(indices) > 1)
+        starts = np.concatenate(([indices[0]], indices[breaks + 1]))
+        ends = np.concatenate((indices[breaks], [indices[-1]])) + 1
+        return [(int(start), int(end)) for start, end in zip(starts, ends)]
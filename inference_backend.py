@@ -0,0 +1,144 @@
+import time
+import queue
+import multiprocessing
+from types import SimpleNamespace
+from mediapipe.framework.formats import landmark_pb2
+from inference_worker import run_worker
+from shared_frames import SharedFrameRing
+
+POLL_INTERVAL = 0.2  # Seconds between worker liveness checks while waiting for a result
+
+
+class ProcessInferenceBackend:
+    """
+    Runs the camera loop's pose and hand models in a separate process.
+
+    Frames are copied once into a SharedFrameRing and only (slot, height,
+    width) references are queued, so MediaPipe, its image conversion and
+    its native threads never hold this process's GIL. Landmarks come back
+    as small NumPy arrays and are rebuilt into the same landmark lists
+    mp.solutions returns, so ROI mapping, feature extraction, gestures and
+    drawing work unchanged.
+
+    A worker that dies or stops answering is terminated and started again,
+    and the ring slots of its unanswered frames are freed. After
+    `max_restarts` failures in a row process() raises RuntimeError.
+    """
+
+    def __init__(self, profile="balanced", slots=3, max_shape=(720, 1280, 3), timeout=2.0, max_restarts=3):
+        self.profile = profile
+        self.timeout = timeout  # Seconds to wait for a result before giving up on a frame
+        self.max_restarts = max_restarts
+        self.ring = SharedFrameRing(slots, max_shape)
+        self.context = multiprocessing.get_context("spawn")
+        self.task_queue = None
+        self.result_queue = None
+        self.worker = None  # Worker process
+        self.pending = {}  # seq -> ring slot
+        self.seq = 0
+        self.failures = 0  # Restarts since the last answered frame
+
+    def start(self):
+        # Fresh queues each time; a terminated worker can leave the old ones unusable
+        self.task_queue = self.context.Queue()
+        self.result_queue = self.context.Queue()
+        self.worker = self.context.Process(
+            target=run_worker,
+            args=(0, self.task_queue, self.result_queue, self.profile, self.ring.spec, True),
+            name="inference-backend", daemon=True)
+        self.worker.start()
+
+    def is_alive(self):
+        return self.worker is not None and self.worker.is_alive()
+
+    def _stop_worker(self, graceful=True):
+        """Stop the worker and free the slots of frames it will never answer"""
+        if self.worker is not None:
+            if graceful and self.worker.is_alive():
+                self.task_queue.put(None)
+                self.worker.join(timeout=5)
+            if self.worker.is_alive():
+                self.worker.terminate()
+                self.worker.join()
+            self.worker = None
+        for slot in self.pending.values():
+            self.ring.release(slot)
+        self.pending.clear()
+
+    def restart(self, reason):
+        """Replace a dead or stuck worker, or raise RuntimeError once it keeps failing"""
+        self.failures += 1
+        self._stop_worker(graceful=False)
+        if self.failures > self.max_restarts:
+            raise RuntimeError(f"Inference process {reason} after {self.max_restarts} restarts")
+        print(f"Inference process {reason}, restarting it")
+        self.start()
+
+    def close(self):
+        self._stop_worker()
+        self.ring.close()
+
+    def submit(self, frame):
+        """Queue a BGR frame for inference; returns its sequence number, or None if every slot is busy"""
+        slot = self.ring.acquire()
+        if slot is None:
+            return None
+        self.seq += 1
+        self.pending[self.seq] = slot
+        self.task_queue.put(("camera", self.seq, self.ring.write(slot, frame), 0.0))
+        return self.seq
+
+    def get(self, timeout=None):
+        """Wait for the next result; returns (seq, results_pose, results_hands), or None on timeout or worker exit"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = POLL_INTERVAL if deadline is None else max(0.0, min(POLL_INTERVAL, deadline - time.monotonic()))
+            try:
+                _, _, seq, landmarks, hands, _ = self.result_queue.get(timeout=wait)
+                break
+            except queue.Empty:
+                if not self.is_alive() or (deadline is not None and time.monotonic() >= deadline):
+                    return None
+        slot = self.pending.pop(seq, None)
+        if slot is not None:
+            self.ring.release(slot)
+        return seq, self._pose_results(landmarks), self._hand_results(hands)
+
+    def process(self, frame):
+        """
+        Run pose and hand inference on a frame and wait for the result (drop-in for pose/hands.process).
+
+        The frame is dropped (no landmarks) if the worker dies or times out;
+        raises RuntimeError when restarting the worker no longer helps.
+        """
+        if not self.is_alive():
+            self.restart("stopped")
+        seq = self.submit(frame)
+        while seq is not None:
+            result = self.get(timeout=self.timeout)
+            if result is None:
+                self.restart("did not answer in time" if self.is_alive() else "stopped")
+                break
+            if result[0] == seq:
+                self.failures = 0
+                return result[1], result[2]
+        return self._pose_results(None), self._hand_results([])
+
+    def _pose_results(self, landmarks):
+        if landmarks is None:
+            return SimpleNamespace(pose_landmarks=None)
+        landmark_list = landmark_pb2.NormalizedLandmarkList()
+        for x, y, z, visibility in landmarks:
+            landmark_list.landmark.add(x=float(x), y=float(y), z=float(z), visibility=float(visibility))
+        return SimpleNamespace(pose_landmarks=landmark_list)
+
+    def _hand_results(self, hands):
+        if not hands:
+            return SimpleNamespace(multi_hand_landmarks=None)
+        multi_hand_landmarks = []
+        for hand in hands:
+            landmark_list = landmark_pb2.NormalizedLandmarkList()
+            for x, y, z in hand:
+                landmark_list.landmark.add(x=float(x), y=float(y), z=float(z))
+            multi_hand_landmarks.append(landmark_list)
+        return SimpleNamespace(multi_hand_landmarks=multi_hand_landmarks)
@@ -0,0 +1,82 @@
+import cv2
+import numpy as np
+from performance_profiles import PERFORMANCE_PROFILES
+from shared_frames import SharedFrameRing
+
+
+def landmarks_to_array(landmarks):
+    """Convert MediaPipe pose landmarks to a 33 x 4 (x, y, z, visibility) array, or None"""
+    if not landmarks:
+        return None
+    return np.array([(lm.x, lm.y, lm.z, lm.visibility) for lm in landmarks.landmark], dtype=np.float32)
+
+
+def hands_to_arrays(multi_hand_landmarks):
+    """Convert MediaPipe hand landmarks to a list of 21 x 3 arrays"""
+    if not multi_hand_landmarks:
+        return []
+    return [np.array([(lm.x, lm.y, lm.z) for lm in hand.landmark], dtype=np.float32)
+            for hand in multi_hand_landmarks]
+
+
+def create_pose(profile="balanced"):
+    import mediapipe as mp
+    settings = PERFORMANCE_PROFILES[profile]
+    return mp.solutions.pose.Pose(
+        model_complexity=settings["model_complexity"],
+        min_detection_confidence=0.5,
+        min_tracking_confidence=0.5)
+
+
+def create_hands(profile="balanced"):
+    import mediapipe as mp
+    settings = PERFORMANCE_PROFILES[profile]
+    return mp.solutions.hands.Hands(
+        model_complexity=settings["hands_complexity"],
+        max_num_hands=settings["max_num_hands"],
+        min_detection_confidence=0.5,
+        min_tracking_confidence=0.5)
+
+
+def run_worker(worker_id, task_queue, result_queue, profile="balanced", ring_spec=None, with_hands=False):
+    """
+    Pose (and optionally hand) inference loop for one worker process.
+
+    Tasks are (source, seq, frame, captured_at) tuples; None stops the
+    worker. With `ring_spec` the frame is a (slot, height, width) reference
+    into a SharedFrameRing and is read in place, otherwise it is a BGR array.
+    Each result is (worker_id, source, seq, landmarks, hands, captured_at),
+    with landmarks as a 33 x 4 array (or None) and hands as a list of 21 x 3
+    arrays. One Pose instance is kept per source so MediaPipe's
+    frame-to-frame tracking is never fed frames from another camera.
+    """
+    ring = SharedFrameRing.attach(ring_spec) if ring_spec else None
+    poses = {}
+    hands = create_hands(profile) if with_hands else None
+    try:
+        while True:
+            task = task_queue.get()
+            if task is None:
+                break
+            source, seq, frame, captured_at = task
+            pose = poses.get(source)
+            if pose is None:
+                pose = poses[source] = create_pose(profile)
+            landmarks, hand_arrays = None, []
+            try:
+                rgb = cv2.cvtColor(ring.view(frame) if ring else frame, cv2.COLOR_BGR2RGB)
+                landmarks = landmarks_to_array(pose.process(rgb).pose_landmarks)
+                if hands is not None:
+                    hand_arrays = hands_to_arrays(hands.process(rgb).multi_hand_landmarks)
+            except Exception as e:
+                print(f"Inference worker {worker_id} error on {source}: {e}")
+            result_queue.put((worker_id, source, seq, landmarks, hand_arrays, captured_at))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for pose in poses.values():
+            pose.close()
+        if hands is not None:
+            hands.close()
+        if ring is not None:
+            ring.close()
@@ -0,0 +1,327 @@
+import os
+import time
+import queue
+import threading
+import multiprocessing
+import cv2
+from esp32_camera import ESP32CameraReceiver
+from inference_worker import run_worker
+from shared_frames import SharedFrameRing
+from performance_profiles import PERFORMANCE_PROFILES
+
+WORKER_CHECK_INTERVAL = 0.5  # Seconds between checks for dead worker processes
+MAX_WORKER_RESTARTS = 3  # Restarts per worker before it is given up on
+
+
+def default_worker_count():
+    """One worker per core, leaving a core for the UI, server and capture threads"""
+    return max(1, (os.cpu_count() or 2) - 1)
+
+
+class CameraSource:
+    """
+    Reads one camera in its own thread and keeps only the newest frame.
+
+    A frame that is replaced before the scheduler takes it counts as dropped,
+    so a slow pipeline never builds up a backlog of stale frames.
+    """
+
+    def __init__(self, name, url=None, device=None, max_side=640):
+        self.name = name
+        self.url = url  # ESP32-CAM stream URL
+        self.device = device  # Local cv2.VideoCapture index, used when no URL is given
+        self.max_side = max_side
+        self.running = False
+        self.thread = None
+        self.lock = threading.Lock()
+        self.frame = None
+        self.seq = 0
+        self.taken_seq = 0
+        self.captured_at = 0.0
+        self.captured = 0
+        self.dropped = 0
+        self.processed = 0
+        self.on_frame = None  # Called after each new frame (wakes the scheduler)
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name=f"camera-{self.name}", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        if self.thread is not None:
+            self.thread.join(timeout=5)
+
+    def _open(self):
+        if self.url:
+            receiver = ESP32CameraReceiver(self.url)
+            return receiver if receiver.connect() else None
+        cap = cv2.VideoCapture(self.device if self.device is not None else 0)
+        return cap if cap.isOpened() else None
+
+    def _run(self):
+        camera = None
+        while self.running:
+            if camera is None:
+                camera = self._open()
+                if camera is None:
+                    print(f"Camera {self.name} not available, retrying")
+                    time.sleep(2)
+                    continue
+
+            ret, frame = camera.read_frame() if self.url else camera.read()
+            if not ret:
+                print(f"Failed to get frame from camera {self.name}")
+                camera.release()
+                camera = None
+                time.sleep(1)
+                continue
+
+            # Downsize here so the scheduler ships small frames to the workers
+            longest = max(frame.shape[:2])
+            if longest > self.max_side:
+                scale = self.max_side / longest
+                frame = cv2.resize(frame, (int(frame.shape[1] * scale), int(frame.shape[0] * scale)),
+                                   interpolation=cv2.INTER_AREA)
+
+            with self.lock:
+                if self.seq > self.taken_seq:
+                    self.dropped += 1
+                self.frame = frame
+                self.seq += 1
+                self.captured += 1
+                self.captured_at = time.time()
+            if self.on_frame is not None:
+                self.on_frame()
+
+        if camera is not None:
+            camera.release()
+
+    def take(self):
+        """Return (seq, frame, captured_at) if a frame arrived since the last call, else None"""
+        with self.lock:
+            if self.seq == self.taken_seq:
+                return None
+            self.taken_seq = self.seq
+            return self.seq, self.frame, self.captured_at
+
+
+class MultiCameraManager:
+    """
+    Runs pose inference for several cameras on a pool of worker processes.
+
+    Each source keeps only its newest frame and has at most one frame in
+    flight. The scheduler hands frames to idle workers round-robin over the
+    sources, so a fast camera cannot starve a slow one, and prefers the
+    worker that handled the source last to keep MediaPipe tracking warm.
+
+    Frames reach the workers through one single-slot SharedFrameRing per
+    worker (a worker only ever has one frame in flight), so only a small
+    slot reference is pickled.
+
+    Results are dicts tagged with the source name (source, seq, landmarks,
+    pose, accuracy, latency) and are passed to `on_result` from the result
+    collector thread and kept in `latest`.
+
+    The collector also watches the worker processes. A dead worker's frame
+    is dropped, its source becomes schedulable again, and the worker is
+    restarted up to MAX_WORKER_RESTARTS times.
+    """
+
+    def __init__(self, estimator=None, num_workers=None, profile="balanced", on_result=None):
+        self.estimator = estimator  # Optional PoseEstimator for matching landmarks to named poses
+        self.num_workers = num_workers or default_worker_count()
+        self.profile = profile
+        self.on_result = on_result
+        self.sources = {}
+        self.latest = {}  # source name -> last result
+        self.running = False
+        self.condition = threading.Condition()
+        self.context = multiprocessing.get_context("spawn")
+        self.workers = []
+        self.task_queues = []
+        self.rings = []  # One shared frame slot per worker
+        self.result_queue = None
+        self.idle_workers = []
+        self.in_flight = set()  # Sources with a frame being processed
+        self.assigned = {}  # worker id -> source whose frame it is processing
+        self.restarts = []  # Restarts per worker
+        self.last_worker = {}  # source name -> worker id that processed it last
+        self.next_source = 0
+        self.threads = []
+
+    def add_source(self, name, url=None, device=None):
+        source = CameraSource(name, url, device, PERFORMANCE_PROFILES[self.profile]["max_side"])
+        source.on_frame = self._wake
+        self.sources[name] = source
+        if self.running:
+            source.start()
+        return source
+
+    def start(self):
+        self.running = True
+        self.result_queue = self.context.Queue()
+        max_side = PERFORMANCE_PROFILES[self.profile]["max_side"]
+        self.rings = [SharedFrameRing(slots=1, max_shape=(max_side, max_side, 3)) for _ in range(self.num_workers)]
+        self.task_queues = [None] * self.num_workers
+        self.workers = [None] * self.num_workers
+        self.restarts = [0] * self.num_workers
+        for worker_id in range(self.num_workers):
+            self._start_worker(worker_id)
+        self.idle_workers = list(range(self.num_workers))
+
+        for target in (self._schedule, self._collect):
+            thread = threading.Thread(target=target, daemon=True)
+            thread.start()
+            self.threads.append(thread)
+        for source in self.sources.values():
+            source.start()
+        print(f"Multi-camera manager started with {len(self.sources)} sources and {self.num_workers} workers")
+
+    def stop(self):
+        self.running = False
+        self._wake()
+        for source in self.sources.values():
+            source.stop()
+        for task_queue in self.task_queues:
+            try:
+                task_queue.put(None, timeout=1)
+            except queue.Full:
+                pass  # A dead worker's queue can still hold its last task
+        for process in self.workers:
+            if process is None:
+                continue
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        self.result_queue.put(None)  # Unblock the collector
+        for thread in self.threads:
+            thread.join(timeout=5)
+        for ring in self.rings:
+            ring.close()
+        self.workers, self.task_queues, self.rings, self.threads = [], [], [], []
+
+    def _start_worker(self, worker_id):
+        """Spawn the process for one worker slot (also used to replace a dead one)"""
+        task_queue = self.context.Queue(maxsize=1)
+        process = self.context.Process(target=run_worker,
+                                       args=(worker_id, task_queue, self.result_queue, self.profile,
+                                             self.rings[worker_id].spec),
+                                       name=f"inference-{worker_id}", daemon=True)
+        process.start()
+        self.task_queues[worker_id] = task_queue
+        self.workers[worker_id] = process
+
+    def _check_workers(self):
+        """Restart workers that died; call with the condition held"""
+        for worker_id, process in enumerate(self.workers):
+            if process is None or process.is_alive():
+                continue
+            # Its frame will never come back, so let the scheduler send that source a new one
+            name = self.assigned.pop(worker_id, None)
+            if name is not None:
+                self.in_flight.discard(name)
+            if worker_id in self.idle_workers:
+                self.idle_workers.remove(worker_id)
+            self.restarts[worker_id] += 1
+            if self.restarts[worker_id] > MAX_WORKER_RESTARTS:
+                self.workers[worker_id] = None
+                alive = sum(worker is not None for worker in self.workers)
+                print(f"Inference worker {worker_id} died again (exit code {process.exitcode}), "
+                      f"giving up on it; {alive} workers left")
+                continue
+            print(f"Inference worker {worker_id} died (exit code {process.exitcode}), restarting it")
+            self._start_worker(worker_id)
+            self.idle_workers.append(worker_id)
+        self.condition.notify()
+
+    def _wake(self):
+        with self.condition:
+            self.condition.notify()
+
+    def _schedule(self):
+        while self.running:
+            with self.condition:
+                task = self._next_task()
+                if task is None:
+                    self.condition.wait(timeout=0.05)
+                    continue
+                worker_id, name, seq, frame, captured_at = task
+                task_queue = self.task_queues[worker_id]
+            # The worker is idle, so its single slot is free to overwrite
+            ref = self.rings[worker_id].write(0, frame)
+            task_queue.put((name, seq, ref, captured_at))
+
+    def _next_task(self):
+        """Pick the next (worker, source, frame) pair round-robin; call with the condition held"""
+        if not self.idle_workers:
+            return None
+        names = list(self.sources)
+        for offset in range(len(names)):
+            name = names[(self.next_source + offset) % len(names)]
+            if name in self.in_flight:
+                continue
+            frame = self.sources[name].take()
+            if frame is None:
+                continue
+            self.next_source = (self.next_source + offset + 1) % len(names)
+            worker_id = self.last_worker.get(name)
+            if worker_id in self.idle_workers:
+                self.idle_workers.remove(worker_id)
+            else:
+                worker_id = self.idle_workers.pop(0)
+            self.in_flight.add(name)
+            self.assigned[worker_id] = name
+            self.last_worker[name] = worker_id
+            return (worker_id, name) + frame
+        return None
+
+    def _collect(self):
+        last_check = time.monotonic()
+        while self.running:
+            if time.monotonic() - last_check >= WORKER_CHECK_INTERVAL:
+                last_check = time.monotonic()
+                with self.condition:
+                    self._check_workers()
+            try:
+                item = self.result_queue.get(timeout=WORKER_CHECK_INTERVAL)
+            except queue.Empty:
+                continue
+            if item is None:
+                break
+            worker_id, name, seq, landmarks, hands, captured_at = item
+            with self.condition:
+                # A result from a worker already written off as dead does not free anything
+                if self.assigned.get(worker_id) == name:
+                    del self.assigned[worker_id]
+                    self.idle_workers.append(worker_id)
+                    self.in_flight.discard(name)
+                    self.condition.notify()
+            self._publish(name, seq, landmarks, captured_at)
+
+    def _publish(self, name, seq, landmarks, captured_at):
+        best_pose, accuracy = None, 0.0
+        if landmarks is not None and self.estimator is not None:
+            features = self.estimator.extract_joint_angles(landmarks)
+            best_pose, accuracy = self.estimator.find_best_pose(features)
+
+        source = self.sources.get(name)
+        if source is not None:
+            source.processed += 1
+        result = {
+            "source": name,
+            "seq": seq,
+            "landmarks": landmarks,
+            "pose": best_pose,
+            "accuracy": accuracy,
+            "latency": time.time() - captured_at
+        }
+        self.latest[name] = result
+        if self.on_result is not None:
+            self.on_result(result)
+
+    def stats(self):
+        """Per-source frame counters: captured, dropped and processed"""
+        return {name: {"captured": source.captured, "dropped": source.dropped, "processed": source.processed}
+                for name, source in self.sources.items()}
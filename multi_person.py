@@ -0,0 +1,148 @@
+import time
+import cv2
+import numpy as np
+import mediapipe as mp
+
+# Landmarks used to locate a person between frames (shoulders and hips)
+_TORSO_LANDMARKS = [11, 12, 23, 24]
+
+
+class PersonTracker:
+    """
+    Keeps stable person IDs across frames by greedily matching torso centres
+    to the people seen in the previous frames.
+    """
+
+    def __init__(self, max_distance=0.15, max_missed_frames=15):
+        self.max_distance = max_distance  # Normalized image distance a person may move per frame
+        self.max_missed_frames = max_missed_frames
+        self.tracks = {}  # person id -> (centre, missed frames)
+        self.next_id = 1
+
+    def reset(self):
+        self.tracks = {}
+
+    def update(self, landmarks):
+        """Assign an ID to each person in a P x 33 x 4 landmark array; returns a list of IDs"""
+        centres = landmarks[:, _TORSO_LANDMARKS, :2].mean(axis=1) if len(landmarks) else np.empty((0, 2))
+        track_ids = list(self.tracks)
+        ids = [None] * len(centres)
+
+        if track_ids and len(centres):
+            previous = np.array([self.tracks[track_id][0] for track_id in track_ids])
+            distances = np.linalg.norm(centres[:, None, :] - previous[None, :, :], axis=-1)
+            # Closest pairs first; each person and each track is used at most once
+            used_tracks = set()
+            for flat_index in np.argsort(distances, axis=None):
+                person, track = np.unravel_index(flat_index, distances.shape)
+                if distances[person, track] > self.max_distance:
+                    break
+                if ids[person] is not None or track in used_tracks:
+                    continue
+                ids[person] = track_ids[track]
+                used_tracks.add(track)
+
+        for person, centre in enumerate(centres):
+            if ids[person] is None:
+                ids[person] = self.next_id
+                self.next_id += 1
+            self.tracks[ids[person]] = (centre, 0)
+
+        # Age out people who were not seen this frame
+        seen = set(ids)
+        for track_id in track_ids:
+            if track_id not in seen:
+                centre, missed = self.tracks[track_id]
+                if missed + 1 > self.max_missed_frames:
+                    del self.tracks[track_id]
+                else:
+                    self.tracks[track_id] = (centre, missed + 1)
+        return ids
+
+
+class MultiPersonPoseEstimator:
+    """
+    Multi-person pose detection and matching.
+
+    Uses the MediaPipe Tasks PoseLandmarker (which, unlike mp.solutions.pose,
+    can return several people per frame), then extracts features and finds the
+    best named pose for everyone in one batched pass through PoseEstimator.
+    Requires a pose landmarker .task model file.
+    """
+
+    def __init__(self, estimator, model_path="models/pose_landmarker_full.task", max_people=4,
+                 min_emit_interval=0.25, min_accuracy_change=2.0):
+        self.estimator = estimator
+        self.person_tracker = PersonTracker()
+        self.min_emit_interval = min_emit_interval
+        self.min_accuracy_change = min_accuracy_change
+        self.last_emitted = {}  # person id -> (pose, accuracy, time)
+        self.last_timestamp_ms = 0
+
+        vision = mp.tasks.vision
+        options = vision.PoseLandmarkerOptions(
+            base_options=mp.tasks.BaseOptions(model_asset_path=model_path),
+            running_mode=vision.RunningMode.VIDEO,
+            num_poses=max_people,
+            min_pose_detection_confidence=0.5,
+            min_tracking_confidence=0.5)
+        self.landmarker = vision.PoseLandmarker.create_from_options(options)
+
+    def close(self):
+        self.landmarker.close()
+
+    def detect(self, frame):
+        """Return a P x 33 x 4 (x, y, z, visibility) array for everyone in a BGR frame"""
+        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        image = mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb)
+        # VIDEO mode needs strictly increasing timestamps
+        timestamp_ms = max(int(time.monotonic() * 1000), self.last_timestamp_ms + 1)
+        self.last_timestamp_ms = timestamp_ms
+        result = self.landmarker.detect_for_video(image, timestamp_ms)
+        if not result.pose_landmarks:
+            return np.empty((0, 33, 4))
+        return np.array([[(lm.x, lm.y, lm.z, lm.visibility or 0.0) for lm in person]
+                         for person in result.pose_landmarks])
+
+    def process(self, frame):
+        """
+        Detect, track and match everyone in the frame.
+
+        Returns:
+        list of dicts with person_id, landmarks (33 x 4), pose, accuracy and
+        emit (whether this person's result changed enough to signal)
+        """
+        landmarks = self.detect(frame)
+        ids = self.person_tracker.update(landmarks)
+        if not ids:
+            return []
+
+        features = self.estimator.extract_joint_angles_batch(landmarks)
+        matches = self.estimator.find_best_poses_batch(features)
+
+        now = time.monotonic()
+        people = []
+        for person_id, person_landmarks, (pose, accuracy) in zip(ids, landmarks, matches):
+            people.append({
+                "person_id": person_id,
+                "landmarks": person_landmarks,
+                "pose": pose,
+                "accuracy": accuracy,
+                "emit": self._should_emit(person_id, pose, accuracy, now)
+            })
+
+        for person_id in list(self.last_emitted):
+            if person_id not in self.person_tracker.tracks:
+                del self.last_emitted[person_id]
+        return people
+
+    def _should_emit(self, person_id, pose, accuracy, now):
+        if pose is None:
+            return False
+        last_pose, last_accuracy, last_time = self.last_emitted.get(person_id, (None, 0.0, 0.0))
+        if now - last_time < self.min_emit_interval:
+            return False
+        if pose == last_pose and abs(accuracy - last_accuracy) < self.min_accuracy_change:
+            return False
+        self.last_emitted[person_id] = (pose, accuracy, now)
+        return True
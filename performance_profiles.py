@@ -0,0 +1,67 @@
+# Named trade-offs between accuracy and speed for the camera pipeline.
+# balanced matches the MediaPipe defaults the app used before profiles existed.
+PERFORMANCE_PROFILES = {
+    "eco": {
+        "model_complexity": 0,      # Pose model: 0 = lite, 1 = full, 2 = heavy
+        "hands_complexity": 0,      # Hands model: 0 = lite, 1 = full
+        "max_num_hands": 1,
+        "max_side": 480,            # Longest side of the MediaPipe input in pixels
+        "frame_stride": 2           # Run inference on every Nth frame
+    },
+    "balanced": {
+        "model_complexity": 1,
+        "hands_complexity": 1,
+        "max_num_hands": 2,
+        "max_side": 640,
+        "frame_stride": 1
+    },
+    "precise": {
+        "model_complexity": 2,
+        "hands_complexity": 1,
+        "max_num_hands": 2,
+        "max_side": 1280,
+        "frame_stride": 1
+    }
+}
+
+# Profiles from fastest to most accurate, used by auto mode to step up or down
+PROFILE_ORDER = ["eco", "balanced", "precise"]
+
+
+class AutoProfileSelector:
+    """
+    Picks a profile from measured frame latency.
+
+    Steps down to a faster profile when the smoothed frame time stays above
+    the target, and back up when it is comfortably below it. After each
+    switch it waits `cooldown` frames so the new profile's latency can settle.
+    """
+
+    def __init__(self, target_fps=15, headroom=0.6, cooldown=60, alpha=0.1, start="balanced"):
+        self.target_frame_time = 1.0 / target_fps
+        self.headroom = headroom  # Step up only when frames take less than this share of the target
+        self.cooldown = cooldown
+        self.alpha = alpha
+        self.current = start
+        self.average = None
+        self.frames_since_switch = 0
+
+    def update(self, frame_time):
+        """Feed one frame's processing time; returns the profile to use"""
+        self.average = frame_time if self.average is None else self.average + self.alpha * (frame_time - self.average)
+        self.frames_since_switch += 1
+        if self.frames_since_switch < self.cooldown:
+            return self.current
+
+        index = PROFILE_ORDER.index(self.current)
+        if self.average > self.target_frame_time and index > 0:
+            self._switch(PROFILE_ORDER[index - 1])
+        elif self.average < self.target_frame_time * self.headroom and index < len(PROFILE_ORDER) - 1:
+            self._switch(PROFILE_ORDER[index + 1])
+        return self.current
+
+    def _switch(self, profile):
+        print(f"Auto performance mode: switching to {profile} profile")
+        self.current = profile
+        self.average = None
+        self.frames_since_switch = 0
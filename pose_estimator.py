@@ -2,18 +2,112 @@ import numpy as np
 import mediapipe as mp
 import os
 import json
+from calorie_calculator import register_pose_intensity
+from performance_profiles import PERFORMANCE_PROFILES
+
+# Order of the features returned by PoseEstimator.extract_joint_angles
+FEATURE_NAMES = [
+    "left_elbow", "right_elbow", "left_shoulder", "right_shoulder", "left_knee", "right_knee",
+    "shoulder_width", "left_arm_length", "right_arm_length",
+    "hip_width", "left_leg_length", "right_leg_length", "torso_length"
+]
+
+# Below this many named poses, pruning costs more than it saves
+PRUNE_MIN_POSES = 32
+
+
+def is_angle_feature(feature):
+    """Whether calculate_pose_accuracy scores a feature as an angle (vs. a distance)"""
+    return ("left_" in feature or "right_" in feature or "_knee" in feature
+            or "_elbow" in feature or "_shoulder" in feature)
+
+
+# Features that enter the angle term of calculate_pose_accuracy
+ANGLE_FEATURES = [name for name in FEATURE_NAMES if is_angle_feature(name)]
+ANGLE_INDEX = np.array([FEATURE_NAMES.index(name) for name in ANGLE_FEATURES])
+DISTANCE_INDEX = np.array([i for i, name in enumerate(FEATURE_NAMES) if not is_angle_feature(name)])
+
+# Per-joint tolerance: this many robust standard deviations of the training batch,
+# capped so a noisy batch cannot make a pose match almost anything
+TOLERANCE_SIGMAS = 1.0
+MAX_ANGLE_TOLERANCE = 15.0      # Degrees
+MAX_DISTANCE_TOLERANCE = 0.15   # Fraction of the mean distance
+# Batch spread above which the report calls a pose noisy
+NOISY_ANGLE_STD = 10.0          # Degrees
+NOISY_DISTANCE_CV = 0.1         # Standard deviation / mean
+
+
+def batch_statistics(batch):
+    """
+    Statistics of a batch of feature dicts (as captured for training).
+    
+    Returns:
+    dict: per-feature dicts "mean", "std", "median" and "tolerance", plus "count"
+    """
+    names = list(batch[0].keys())
+    values = np.array([[features[name] for name in names] for features in batch], dtype=np.float64)
+    
+    mean = values.mean(axis=0)
+    std = values.std(axis=0)
+    median = np.median(values, axis=0)
+    # Robust spread (scaled median absolute deviation) ignores single bad captures
+    robust_std = 1.4826 * np.median(np.abs(values - median), axis=0)
+    is_angle = np.array([is_angle_feature(name) for name in names])
+    cap = np.where(is_angle, MAX_ANGLE_TOLERANCE, MAX_DISTANCE_TOLERANCE * np.abs(mean))
+    tolerance = np.minimum(TOLERANCE_SIGMAS * robust_std, cap)
+    
+    return {
+        "count": len(batch),
+        "mean": dict(zip(names, mean.tolist())),
+        "std": dict(zip(names, std.tolist())),
+        "median": dict(zip(names, median.tolist())),
+        "tolerance": dict(zip(names, tolerance.tolist()))
+    }
+
+
+# (a, b, c) landmark triples for each angle feature, angle measured at b
+_ANGLE_JOINTS = np.array([(11, 13, 15), (12, 14, 16), (13, 11, 23), (14, 12, 24), (23, 25, 27), (24, 26, 28)])
+# Landmark pairs summed into each limb length feature
+_LIMB_SEGMENTS = np.array([[(11, 13), (13, 15)], [(12, 14), (14, 16)], [(23, 25), (25, 27)], [(24, 26), (26, 28)]])
 
 class PoseEstimator:
-    def __init__(self):
+    def __init__(self, load_models=True, profile="balanced"):
         self.mp_pose = mp.solutions.pose
         self.mp_hands = mp.solutions.hands  # Add MediaPipe hands
-        self.pose = self.mp_pose.Pose(min_detection_confidence=0.5, min_tracking_confidence=0.5)
-        self.hands = self.mp_hands.Hands(min_detection_confidence=0.5, min_tracking_confidence=0.5)  # Initialize hands
+        self.pose = None
+        self.hands = None
+        self.profile = profile
+        # Benchmarks and landmark replay can skip loading the MediaPipe models
+        if load_models:
+            self.load_models(profile)
         self.trained_poses = []  # Loaded from file (omitted here for brevity)
         self.named_poses = {}  # Dictionary to store named poses
+        self.pose_mets = {}  # User-attached MET values for named poses
+        self.pose_stats = {}  # Training batch statistics (incl. per-joint tolerances) for named poses
+        self._poses_version = 0  # Bumped on every change to named_poses or pose_stats
+        self._candidate_key = None
+        self._candidate_names = []
+        self._candidate_targets = None
+        self._candidate_tolerances = None
         
         # Load saved poses if available
         self.load_poses()
+        self.load_pose_mets()
+        self.load_pose_stats()
+        
+    def load_models(self, profile="balanced"):
+        """(Re)create the MediaPipe models with the settings of a performance profile"""
+        settings = PERFORMANCE_PROFILES[profile]
+        if self.pose is not None:
+            self.pose.close()
+        if self.hands is not None:
+            self.hands.close()
+        self.pose = self.mp_pose.Pose(model_complexity=settings["model_complexity"],
+                                      min_detection_confidence=0.5, min_tracking_confidence=0.5)
+        self.hands = self.mp_hands.Hands(model_complexity=settings["hands_complexity"],
+                                         max_num_hands=settings["max_num_hands"],
+                                         min_detection_confidence=0.5, min_tracking_confidence=0.5)  # Initialize hands
+        self.profile = profile
         
     def calculate_angle(self, a, b, c):
         a, b, c = np.array(a), np.array(b), np.array(c)
@@ -27,7 +121,11 @@ class PoseEstimator:
         return np.linalg.norm(a - b)
         
     def extract_joint_angles(self, landmarks):
-        keypoints = [(lm.x, lm.y) for lm in landmarks]
+        # Accept MediaPipe landmarks or an N x (2+) array of x, y(, z, visibility)
+        if isinstance(landmarks, np.ndarray):
+            keypoints = landmarks[:, :2]
+        else:
+            keypoints = [(lm.x, lm.y) for lm in landmarks]
         angles = {
             "left_elbow": self.calculate_angle(keypoints[11], keypoints[13], keypoints[15]),
             "right_elbow": self.calculate_angle(keypoints[12], keypoints[14], keypoints[16]),
@@ -77,45 +175,300 @@ class PoseEstimator:
             target_features = self.named_poses[target_pose]
             
             if target_features:
-                # Calculate the difference between current and target features
-                angle_diffs = []
-                distance_diffs = []
+                common = [feature for feature in current_features if feature in target_features]
+                current = np.array([current_features[feature] for feature in common], dtype=np.float64)
+                target = np.array([target_features[feature] for feature in common], dtype=np.float64)
+                tolerances = self.pose_stats.get(target_pose, {}).get("tolerance", {})
+                tolerance = np.array([tolerances.get(feature, 0.0) for feature in common], dtype=np.float64)
+                is_angle = np.array([is_angle_feature(feature) for feature in common], dtype=bool)
                 
-                for feature, current_value in current_features.items():
-                    if feature in target_features:
-                        if "left_" in feature or "right_" in feature or "_knee" in feature or "_elbow" in feature or "_shoulder" in feature:
-                            # This is an angle - normalize difference
-                            diff = abs(current_value - target_features[feature])
-                            angle_diffs.append(min(diff, 360 - diff) / 180.0)  # Normalize to 0-1
-                        else:
-                            # This is a distance - normalize by the target value
-                            if target_features[feature] > 0:  # Avoid division by zero
-                                diff = abs(current_value - target_features[feature]) / target_features[feature]
-                                distance_diffs.append(min(1.0, diff))  # Cap at 1.0 (100% difference)
+                # Angles wrap at 360 and are normalized by 180; distances are relative to the
+                # target (capped at 100%) and only count when the target is positive.
+                # Differences within the pose's per-joint tolerance count as zero.
+                diff = np.abs(current - target)
+                diff = np.where(is_angle, np.minimum(diff, 360 - diff), diff)
+                diff = np.maximum(diff - tolerance, 0.0)
+                with np.errstate(invalid="ignore", divide="ignore"):
+                    terms = np.where(is_angle, diff / 180.0, np.minimum(1.0, diff / target))
+                angle_terms = terms[is_angle]
+                distance_terms = terms[~is_angle & (target > 0)]
                 
-                # Weight angles more heavily than distances (70% angles, 30% distances)
-                if angle_diffs and distance_diffs:
-                    avg_angle_diff = sum(angle_diffs) / len(angle_diffs)
-                    avg_distance_diff = sum(distance_diffs) / len(distance_diffs)
-                    weighted_diff = (0.7 * avg_angle_diff) + (0.3 * avg_distance_diff)
-                    accuracy = max(0, 100 - (weighted_diff * 100))
-                    return accuracy
-                elif angle_diffs:
-                    # Fall back to just angles if no distances
-                    avg_diff = sum(angle_diffs) / len(angle_diffs)
-                    accuracy = max(0, 100 - (avg_diff * 100))
-                    return accuracy
+                # Weight angles more heavily than distances (70% angles, 30% distances),
+                # falling back to just angles if no distances
+                if len(angle_terms):
+                    weighted_diff = (0.7 * angle_terms.mean() + 0.3 * distance_terms.mean()
+                                     if len(distance_terms) else angle_terms.mean())
+                    return max(0, 100 - (weighted_diff * 100))
         
         # If we don't have target poses or couldn't calculate accuracy based on features,
         # return a simulated accuracy based on detection quality
         # For demo purposes, we'll return a value between 50-95%
         return np.random.uniform(50, 95)
     
-    def add_named_pose(self, name, features):
-        """Add a named pose to the dictionary"""
+    def find_best_pose(self, current_features):
+        """
+        Find the named pose that best matches the current features.
+        
+        Returns:
+        tuple: (best pose name or None, its accuracy)
+        """
+        if len(self.named_poses) >= PRUNE_MIN_POSES:
+            return self._find_best_pose_pruned(current_features)
+        
+        best_pose = None
+        best_accuracy = 0
+        for pose_name in self.named_poses:
+            # Calculate accuracy for this pose
+            accuracy = self.calculate_pose_accuracy(current_features, pose_name)
+            
+            # If this is the best match so far, update
+            if accuracy > best_accuracy:
+                best_accuracy = accuracy
+                best_pose = pose_name
+        return best_pose, best_accuracy
+    
+    def _pose_matrix(self):
+        """Matrix of every named pose's features in FEATURE_NAMES order (NaN where missing), rebuilt when poses change"""
+        key = self._poses_version
+        if key != self._candidate_key:
+            self._candidate_names = list(self.named_poses)
+            self._candidate_targets = np.array(
+                [[features.get(name, np.nan) for name in FEATURE_NAMES] for features in self.named_poses.values()],
+                dtype=np.float64).reshape(len(self._candidate_names), len(FEATURE_NAMES))
+            self._candidate_tolerances = np.array(
+                [[self.pose_stats.get(pose, {}).get("tolerance", {}).get(name, 0.0) for name in FEATURE_NAMES]
+                 for pose in self._candidate_names],
+                dtype=np.float64).reshape(len(self._candidate_names), len(FEATURE_NAMES))
+            self._candidate_key = key
+        return self._candidate_names, self._candidate_targets
+    
+    def _candidate_index(self):
+        """Names, angle-feature columns of the pose matrix and their tolerances"""
+        names, targets = self._pose_matrix()
+        return names, targets[:, ANGLE_INDEX], self._candidate_tolerances[:, ANGLE_INDEX]
+    
+    def extract_joint_angles_batch(self, landmarks):
+        """
+        Vectorized extract_joint_angles for several people at once.
+        
+        Parameters:
+        landmarks: P x 33 x (2+) array of x, y(, z, visibility)
+        
+        Returns:
+        P x len(FEATURE_NAMES) array in FEATURE_NAMES order
+        """
+        points = np.asarray(landmarks, dtype=np.float64)[:, :, :2]
+        
+        a, b, c = points[:, _ANGLE_JOINTS[:, 0]], points[:, _ANGLE_JOINTS[:, 1]], points[:, _ANGLE_JOINTS[:, 2]]
+        ba, bc = a - b, c - b
+        with np.errstate(invalid="ignore", divide="ignore"):
+            cosine = (ba * bc).sum(-1) / (np.linalg.norm(ba, axis=-1) * np.linalg.norm(bc, axis=-1))
+        angles = np.degrees(np.arccos(np.clip(cosine, -1.0, 1.0)))
+        
+        def dist(i, j):
+            return np.linalg.norm(points[:, i] - points[:, j], axis=-1)
+        
+        limbs = np.linalg.norm(points[:, _LIMB_SEGMENTS[..., 0]] - points[:, _LIMB_SEGMENTS[..., 1]], axis=-1).sum(-1)
+        shoulder_mid = (points[:, 11] + points[:, 12]) / 2
+        hip_mid = (points[:, 23] + points[:, 24]) / 2
+        
+        # Columns follow FEATURE_NAMES
+        return np.column_stack([
+            angles,
+            dist(11, 12), limbs[:, 0], limbs[:, 1],
+            dist(23, 24), limbs[:, 2], limbs[:, 3],
+            np.linalg.norm(shoulder_mid - hip_mid, axis=-1)
+        ])
+    
+    def score_feature_matrix(self, features):
+        """
+        Accuracy of every row of a P x len(FEATURE_NAMES) feature matrix against
+        every named pose, with the same weighting as calculate_pose_accuracy.
+        Poses that cannot be scored get 0 instead of a simulated value.
+        
+        Returns:
+        (pose names, P x N accuracy matrix)
+        """
+        names, targets = self._pose_matrix()
+        tolerances = self._candidate_tolerances
+        features = np.asarray(features, dtype=np.float64)
+        diff = np.abs(features[:, None, :] - targets[None, :, :])
+        
+        angle_diff = diff[..., ANGLE_INDEX]
+        angle_diff = np.minimum(angle_diff, 360 - angle_diff) - tolerances[:, ANGLE_INDEX]
+        angle_terms = np.where(angle_diff > 0, angle_diff, np.where(np.isnan(angle_diff), np.nan, 0.0)) / 180.0
+        angle_valid = ~np.isnan(angle_terms)
+        angle_count = angle_valid.sum(-1)
+        
+        distance_targets = targets[:, DISTANCE_INDEX]
+        distance_diff = diff[..., DISTANCE_INDEX] - tolerances[:, DISTANCE_INDEX]
+        distance_diff = np.where(distance_diff > 0, distance_diff, np.where(np.isnan(distance_diff), np.nan, 0.0))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            distance_terms = np.minimum(1.0, distance_diff / distance_targets)
+        distance_valid = ~np.isnan(distance_terms) & (distance_targets > 0)
+        distance_count = distance_valid.sum(-1)
+        
+        with np.errstate(invalid="ignore", divide="ignore"):
+            avg_angle = np.where(angle_valid, angle_terms, 0).sum(-1) / angle_count
+            avg_distance = np.where(distance_valid, distance_terms, 0).sum(-1) / distance_count
+        weighted = np.where(distance_count > 0, 0.7 * avg_angle + 0.3 * avg_distance, avg_angle)
+        accuracy = np.where(angle_count > 0, np.maximum(0, 100 - weighted * 100), 0.0)
+        return names, accuracy
+    
+    def find_best_poses_batch(self, features):
+        """Best (pose name or None, accuracy) for every row of a feature matrix"""
+        if not self.named_poses or len(features) == 0:
+            return [(None, 0) for _ in range(len(features))]
+        names, accuracy = self.score_feature_matrix(features)
+        best = accuracy.argmax(axis=1)
+        best_accuracy = accuracy[np.arange(len(best)), best]
+        return [(names[i], float(acc)) if acc > 0 else (None, 0) for i, acc in zip(best, best_accuracy)]
+    
+    def _find_best_pose_pruned(self, current_features):
+        """
+        Same result as the full loop, but candidates are fully scored in order of
+        an upper bound on their accuracy and the search stops once no remaining
+        candidate can beat the best so far.
+        
+        The bound comes from the angle term alone: every angle difference
+        (after subtracting the pose's tolerance) is non-negative, so the
+        weighted difference is at least
+        0.7 * (sum of the known angle terms) / (number of angle features).
+        """
+        names, targets, tolerances = self._candidate_index()
+        current = np.array([current_features.get(name, np.nan) for name in ANGLE_FEATURES], dtype=np.float64)
+        angle_count = sum(1 for feature in current_features if is_angle_feature(feature))
+        if angle_count == 0:
+            angle_count = 1
+        
+        diff = np.abs(targets - current)
+        terms = np.maximum(np.minimum(diff, 360 - diff) - tolerances, 0.0) / 180.0
+        # Missing or undefined features contribute nothing, which keeps the bound valid
+        terms = np.where(np.isnan(terms), 0.0, terms)
+        upper = 100 - 100 * (0.7 * terms.sum(axis=1) / angle_count) + 1e-6
+        
+        best_pose = None
+        best_accuracy = 0
+        best_index = -1
+        for index in np.argsort(-upper, kind="stable"):
+            if upper[index] < best_accuracy:
+                break  # No remaining candidate can do better
+            accuracy = self.calculate_pose_accuracy(current_features, names[index])
+            # Ties go to the earlier pose, as in the full loop
+            if accuracy > best_accuracy or (accuracy == best_accuracy and best_pose is not None and index < best_index):
+                best_accuracy = accuracy
+                best_pose = names[index]
+                best_index = index
+        return best_pose, best_accuracy
+    
+    def set_named_poses(self, poses):
+        """Replace the whole pose library (e.g. with a loaded or generated one)"""
+        self.named_poses = poses
+        self._poses_version += 1
+    
+    def add_named_pose(self, name, features, stats=None):
+        """Add a named pose to the dictionary, optionally with its training batch statistics"""
         self.named_poses[name] = features
+        if stats is not None:
+            self.pose_stats[name] = stats
+            self.save_pose_stats()
+        elif self.pose_stats.pop(name, None) is not None:
+            self.save_pose_stats()  # Old statistics no longer describe the new features
+        self._poses_version += 1
         # Save poses to file whenever a new one is added
         self.save_poses() 
+    
+    def save_pose_stats(self):
+        """Save training batch statistics to a JSON file"""
+        os.makedirs("poses", exist_ok=True)
+        with open("poses/pose_stats.json", "w") as f:
+            json.dump(self.pose_stats, f)
+            
+    def load_pose_stats(self):
+        """Load training batch statistics for the saved poses"""
+        try:
+            if os.path.exists("poses/pose_stats.json"):
+                with open("poses/pose_stats.json", "r") as f:
+                    self.pose_stats = json.load(f)
+                self._poses_version += 1
+        except Exception as e:
+            print(f"Error loading pose statistics: {e}")
+            self.pose_stats = {}
+            self._poses_version += 1
+    
+    def pose_quality_report(self):
+        """
+        Summarize how stable each stored pose's training batch was.
+        
+        The typical accuracy is what a capture one standard deviation away from
+        the mean on every joint scores against the pose, i.e. how much accuracy
+        ordinary variation in the pose costs.
+        
+        Returns:
+        list of dicts: name, count, max_angle_std, max_distance_cv, typical_accuracy
+        and quality ("stable", "noisy" or "unknown" for poses saved without statistics)
+        """
+        names, targets = self._pose_matrix()
+        stds = np.array([[self.pose_stats.get(pose, {}).get("std", {}).get(name, np.nan) for name in FEATURE_NAMES]
+                         for pose in names], dtype=np.float64).reshape(len(names), len(FEATURE_NAMES))
+        
+        # fmax skips NaN (features a pose has no statistics for) and stays NaN if all are missing
+        with np.errstate(invalid="ignore", divide="ignore"):
+            distance_cv = stds[:, DISTANCE_INDEX] / targets[:, DISTANCE_INDEX]
+        max_angle_std = np.fmax.reduce(stds[:, ANGLE_INDEX], axis=1)
+        max_distance_cv = np.fmax.reduce(distance_cv, axis=1)
+        
+        # Score every pose's "one standard deviation off" capture against every pose at once
+        typical = np.zeros(len(names))
+        if len(names):
+            _, accuracy = self.score_feature_matrix(targets + np.nan_to_num(stds))
+            typical = accuracy[np.arange(len(names)), np.arange(len(names))]
+        
+        report = []
+        for i, name in enumerate(names):
+            stats = self.pose_stats.get(name)
+            if stats is None:
+                quality = "unknown"
+            elif max_angle_std[i] > NOISY_ANGLE_STD or max_distance_cv[i] > NOISY_DISTANCE_CV:
+                quality = "noisy"
+            else:
+                quality = "stable"
+            report.append({
+                "name": name,
+                "count": stats["count"] if stats else 0,
+                "max_angle_std": None if np.isnan(max_angle_std[i]) else float(max_angle_std[i]),
+                "max_distance_cv": None if np.isnan(max_distance_cv[i]) else float(max_distance_cv[i]),
+                "typical_accuracy": float(typical[i]),
+                "quality": quality
+            })
+        return report
+               
+    def set_pose_met(self, name, met, intensity=None):
+        """Attach a MET value (and optionally an intensity level, else the one its name implies) to a named pose"""
+        if name not in self.named_poses:
+            print(f"Cannot set MET for unknown pose {name}")
+            return
+        self.pose_mets[name] = {"met": float(met), "intensity": intensity}
+        register_pose_intensity(name, intensity, met)
+        self.save_pose_mets()
+        
+    def save_pose_mets(self):
+        """Save user-attached MET values to a JSON file"""
+        os.makedirs("poses", exist_ok=True)
+        with open("poses/pose_mets.json", "w") as f:
+            json.dump(self.pose_mets, f)
+            
+    def load_pose_mets(self):
+        """Load user-attached MET values and register them with the calorie calculator"""
+        try:
+            if os.path.exists("poses/pose_mets.json"):
+                with open("poses/pose_mets.json", "r") as f:
+                    self.pose_mets = json.load(f)
+                for name, entry in self.pose_mets.items():
+                    register_pose_intensity(name, entry.get("intensity"), entry.get("met"))
+        except Exception as e:
+            print(f"Error loading pose MET values: {e}")
+            self.pose_mets = {}
                
     def save_poses(self):
         """Save all poses to a JSON file"""
@@ -139,7 +492,7 @@ class PoseEstimator:
                     loaded_poses = json.load(f)
                 
                 # Convert the loaded poses to the new format if they're in the old format
-                self.named_poses = {}
+                named_poses = {}
                 for name, features in loaded_poses.items():
                     # Check if this is an old format pose (only has angles)
                     if all(key in ["left_elbow", "right_elbow", "left_shoulder", 
@@ -148,16 +501,17 @@ class PoseEstimator:
                         print(f"Converting pose {name} to new format")
                         # This is an old format - we'll keep it as is for now
                         # The next time the user captures this pose, it will be updated
-                        self.named_poses[name] = features
+                        named_poses[name] = features
                     else:
                         # This is already in the new format
-                        self.named_poses[name] = features
+                        named_poses[name] = features
+                self.set_named_poses(named_poses)
                 
                 print(f"Loaded {len(self.named_poses)} saved poses")
         except Exception as e:
             print(f"Error loading saved poses: {e}")
             # If there's an error, start with empty poses
-            self.named_poses = {}
+            self.set_named_poses({})
 
     def detect_open_palm(self, hand_landmarks):
         """Detects an open palm based on the position of all five fingertips."""
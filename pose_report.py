@@ -0,0 +1,44 @@
+"""
+Report how stable each saved pose's training batch was.
+
+Run from the project root (where the poses/ folder is):
+    python pose_report.py
+    python pose_report.py --json report.json
+"""
+import argparse
+import json
+
+from pose_estimator import PoseEstimator, NOISY_ANGLE_STD, NOISY_DISTANCE_CV
+
+
+def format_value(value, pattern):
+    return "-" if value is None else pattern.format(value)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Training quality report for saved poses")
+    parser.add_argument("--json", help="also write the report to this JSON file")
+    args = parser.parse_args()
+
+    estimator = PoseEstimator(load_models=False)
+    report = estimator.pose_quality_report()
+    if not report:
+        print("No saved poses")
+        return
+
+    print(f"{'Pose':<24} {'Images':>6} {'Max angle std':>14} {'Max dist CV':>12} {'Typical acc':>12}  Quality")
+    for entry in report:
+        print(f"{entry['name']:<24} {entry['count']:>6} "
+              f"{format_value(entry['max_angle_std'], '{:.1f} deg'):>14} "
+              f"{format_value(entry['max_distance_cv'], '{:.3f}'):>12} "
+              f"{entry['typical_accuracy']:>11.1f}%  {entry['quality']}")
+    print(f"\nNoisy: an angle std above {NOISY_ANGLE_STD:.0f} deg or a distance CV above {NOISY_DISTANCE_CV}. "
+          "Re-capture noisy poses; 'unknown' poses were saved before batch statistics existed.")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
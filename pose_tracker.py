@@ -0,0 +1,136 @@
+import time
+import numpy as np
+
+
+class PoseTracker:
+    """
+    Temporal smoothing and hysteresis for the per-frame pose classification.
+
+    Landmarks and per-pose scores are smoothed with an exponential moving
+    average. The reported pose only switches when a challenger's smoothed
+    score beats the current pose by `switch_margin` for `switch_frames`
+    consecutive frames, and an update is only signalled when the pose or
+    accuracy level changes, or the accuracy moves by `min_accuracy_change`,
+    and never more often than every `min_emit_interval` seconds.
+
+    A pose's smoothed score only carries over if the pose was also scored on
+    the previous frame with landmarks, so a pose seen again after a while
+    starts from its fresh score. Frames without landmarks are reported with
+    missing(); all state is held through up to `max_gap_frames` of them in
+    a row, so a brief detection dropout does not restart the smoothing.
+    """
+
+    def __init__(self, estimator, alpha=0.3, switch_margin=5.0, switch_frames=5,
+                 min_emit_interval=0.25, min_accuracy_change=2.0, threshold=40, max_gap_frames=5):
+        self.estimator = estimator
+        self.alpha = alpha
+        self.switch_margin = switch_margin
+        self.switch_frames = switch_frames
+        self.min_emit_interval = min_emit_interval
+        self.min_accuracy_change = min_accuracy_change
+        self.threshold = threshold  # Minimum accuracy to report a pose at all
+        self.max_gap_frames = max_gap_frames
+        self.frame = 0  # Frames with landmarks seen so far
+        self.reset()
+
+    def reset(self):
+        """Forget all history, e.g. when the person leaves the frame"""
+        self.smoothed_landmarks = None
+        self.scores = {}  # pose name -> (smoothed accuracy, frame it was last scored on)
+        self.missing_frames = 0
+        self.current_pose = None
+        self.challenger = None
+        self.challenger_frames = 0
+        self.last_emitted = (None, 0.0)
+        self.last_emit_time = 0.0
+
+    def smooth_landmarks(self, landmarks):
+        """Return the EMA of the landmarks as a 33 x 4 (x, y, z, visibility) array"""
+        self.frame += 1
+        self.missing_frames = 0
+        current = np.array([(lm.x, lm.y, lm.z, lm.visibility) for lm in landmarks])
+        if self.smoothed_landmarks is None or self.smoothed_landmarks.shape != current.shape:
+            self.smoothed_landmarks = current
+        else:
+            self.smoothed_landmarks += self.alpha * (current - self.smoothed_landmarks)
+        return self.smoothed_landmarks
+
+    def missing(self):
+        """Count a frame without landmarks; after more than max_gap_frames in a row, reset"""
+        self.missing_frames += 1
+        if self.missing_frames > self.max_gap_frames:
+            self.reset()
+
+    def _smooth_score(self, pose_name, accuracy):
+        previous, scored_frame = self.scores.get(pose_name, (None, None))
+        if previous is None or scored_frame < self.frame - 1:
+            score = accuracy  # Not scored on the previous frame, so the old average is stale
+        else:
+            score = previous + self.alpha * (accuracy - previous)
+        self.scores[pose_name] = (score, self.frame)
+        return score
+
+    def update(self, features):
+        """
+        Score the features and update the tracked pose.
+
+        Returns:
+        tuple: (stable pose name or None, its smoothed accuracy, whether to signal the change)
+        """
+        best_pose, best_accuracy = self.estimator.find_best_pose(features)
+        if best_pose is not None:
+            best_score = self._smooth_score(best_pose, best_accuracy)
+
+        # Keep the current pose's score fresh even when it is not this frame's best
+        current_score = 0.0
+        if self.current_pose is not None and self.current_pose != best_pose:
+            if self.current_pose in self.estimator.named_poses:
+                current_score = self._smooth_score(
+                    self.current_pose, self.estimator.calculate_pose_accuracy(features, self.current_pose))
+            else:
+                self.current_pose = None
+        elif self.current_pose is not None:
+            current_score = best_score
+
+        # Hysteresis: a challenger has to stay clearly ahead for several frames
+        if best_pose is not None and best_pose != self.current_pose:
+            if self.current_pose is None or best_score > current_score + self.switch_margin:
+                if best_pose == self.challenger:
+                    self.challenger_frames += 1
+                else:
+                    self.challenger = best_pose
+                    self.challenger_frames = 1
+                if self.current_pose is None or self.challenger_frames >= self.switch_frames:
+                    self.current_pose = best_pose
+                    current_score = best_score
+                    self.challenger = None
+                    self.challenger_frames = 0
+            else:
+                self.challenger = None
+                self.challenger_frames = 0
+
+        if self.current_pose is None or current_score <= self.threshold:
+            return None, current_score, False
+        return self.current_pose, current_score, self._should_emit(self.current_pose, current_score)
+
+    def _should_emit(self, pose_name, accuracy):
+        now = time.monotonic()
+        if now - self.last_emit_time < self.min_emit_interval:
+            return False
+
+        last_pose, last_accuracy = self.last_emitted
+        changed = (pose_name != last_pose
+                   or self._level(accuracy) != self._level(last_accuracy)
+                   or abs(accuracy - last_accuracy) >= self.min_accuracy_change)
+        if changed:
+            self.last_emitted = (pose_name, accuracy)
+            self.last_emit_time = now
+        return changed
+
+    def _level(self, accuracy):
+        # Same bands ModernYogaApp.update_accuracy uses for its feedback
+        if accuracy > 80:
+            return "high"
+        if accuracy > 60:
+            return "medium"
+        return "low"
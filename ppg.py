@@ -0,0 +1,183 @@
+import time
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+SAMPLE_RATE = 100  # Hz, the MAX30102 rate the firmware streams at
+WINDOW_SECONDS = 8  # Samples kept per device for the estimate
+MIN_SECONDS = 4  # Samples needed before the first estimate
+FINGER_IR_THRESHOLD = 50000  # Mean IR level below which no finger is on the sensor
+BASELINE_SECONDS = 1.5  # Moving average removed as baseline (high-pass, passes >= ~0.7 Hz / 42 bpm)
+SMOOTHING_SECONDS = 0.1  # Moving average applied to what is left (low-pass)
+MIN_BEAT_SECONDS = 0.3  # Closest two beats can be (200 bpm)
+MIN_HEART_RATE = 40
+MAX_HEART_RATE = 200
+HEART_RATE_SMOOTHING = 0.3  # Weight of a new estimate against the previous one
+PULSE_CORRELATION = 0.5  # Autocorrelation a 40-200 bpm lag must reach for the window to count as a pulse
+MAX_MISSED_WINDOWS = 4  # Estimates in a row without a pulse before the reading drops to 0
+MIN_SAMPLE_RATE = 25
+MAX_SAMPLE_RATE = 1000
+
+
+def moving_average(x, width):
+    """Centered moving average of x with edge padding, in O(len(x)) via a cumulative sum"""
+    width = max(1, int(width))
+    pad = width // 2
+    padded = np.pad(x, (pad, width - 1 - pad), mode="edge")
+    sums = np.concatenate(([0.0], np.cumsum(padded)))
+    return (sums[width:] - sums[:-width]) / width
+
+
+def band_pass(x, sample_rate):
+    """Remove the slow baseline and high-frequency noise from a PPG trace"""
+    ac = x - moving_average(x, BASELINE_SECONDS * sample_rate)
+    return moving_average(ac, SMOOTHING_SECONDS * sample_rate)
+
+
+def pulse_strength(y, min_lag, max_lag):
+    """
+    Highest normalized autocorrelation of y at lags min_lag..max_lag.
+
+    A pulse repeats once per beat, so some lag in the heart rate range
+    correlates strongly; band-passed noise decorrelates within a few
+    samples and stays near 0 there, however its peaks happen to line up.
+    """
+    y = y - y.mean()
+    energy = np.dot(y, y)
+    if energy <= 0 or max_lag >= len(y):
+        return 0.0
+    spectrum = np.fft.rfft(y, 2 * len(y))
+    correlation = np.fft.irfft(spectrum * np.conj(spectrum))[min_lag:max_lag + 1]
+    # Divide out the shrinking overlap so long lags are not penalized
+    overlap = len(y) - np.arange(min_lag, max_lag + 1)
+    return float((correlation * len(y) / overlap).max() / energy)
+
+
+def find_peaks(y, min_distance):
+    """Indices of samples that are the maximum within +-min_distance and above half the signal's spread"""
+    # Only rising-then-falling samples away from the window edges can qualify, so
+    # the neighbourhood maximum is taken for those few candidates alone
+    candidates = np.flatnonzero((y[1:-1] > y[:-2]) & (y[1:-1] >= y[2:]) & (y[1:-1] > 0.5 * y.std())) + 1
+    candidates = candidates[(candidates >= min_distance) & (candidates < len(y) - min_distance)]
+    neighbourhoods = sliding_window_view(y, 2 * min_distance + 1)[candidates - min_distance]
+    return candidates[y[candidates] == neighbourhoods.max(axis=1)]
+
+
+def valid_sample_rate(sample_rate):
+    return (isinstance(sample_rate, (int, float)) and not isinstance(sample_rate, bool)
+            and MIN_SAMPLE_RATE <= sample_rate <= MAX_SAMPLE_RATE)
+
+
+class PPGStream:
+    """
+    Streaming heart rate and SpO2 from one MAX30102's raw IR/red samples.
+
+    Batches are written into fixed-size ring buffers holding the last
+    WINDOW_SECONDS of samples, so memory stays O(window) however long the
+    device streams. After each batch the window is band-passed with two
+    cumulative-sum moving averages and its beats found with a vectorized
+    local-maximum test; heart rate comes from the median beat interval
+    (smoothed across batches) and SpO2 from the red/IR ratio of ratios.
+    Beats only count when the window's autocorrelation shows a real pulse,
+    and the reading drops to 0 after a few estimates without one.
+    """
+
+    def __init__(self, sample_rate=SAMPLE_RATE, window_seconds=WINDOW_SECONDS):
+        if not valid_sample_rate(sample_rate):
+            raise ValueError(f"Sample rate must be a number from {MIN_SAMPLE_RATE} to {MAX_SAMPLE_RATE} Hz")
+        self.sample_rate = sample_rate
+        self.size = int(window_seconds * sample_rate)
+        self.ir = np.zeros(self.size)
+        self.red = np.zeros(self.size)
+        self.has_red = np.zeros(self.size, dtype=bool)  # Which buffered samples came with a red value
+        self.count = 0  # Samples received in total
+        self.missed = 0  # Estimates in a row without a pulse
+        self.heart_rate = 0
+        self.spo2 = 0
+        self.updated = None
+
+    def add(self, ir, red=None):
+        """Append a batch of samples and return the updated (heart_rate, spo2); 0 means unknown"""
+        ir = np.asarray(ir, dtype=np.float64).ravel()
+        red = None if red is None else np.asarray(red, dtype=np.float64).ravel()
+        if red is not None and len(red) != len(ir):
+            raise ValueError("ir and red batches must have the same length")
+        if not len(ir):
+            return self.heart_rate, self.spo2
+
+        # Only the newest `size` samples of a long batch can end up in the window
+        ir = ir[-self.size:]
+        positions = (self.count + np.arange(len(ir))) % self.size
+        self.ir[positions] = ir
+        self.has_red[positions] = red is not None
+        if red is not None:
+            self.red[positions] = red[-self.size:]
+        self.count += len(ir)
+        self.updated = time.time()
+
+        if self.count >= MIN_SECONDS * self.sample_rate:
+            self._estimate()
+        return self.heart_rate, self.spo2
+
+    def window(self, buffer):
+        """Buffered samples in time order"""
+        if self.count < self.size:
+            return buffer[:self.count]
+        start = self.count % self.size
+        return np.concatenate((buffer[start:], buffer[:start]))
+
+    def _estimate(self):
+        ir = self.window(self.ir)
+        ir_dc = ir.mean()
+        if ir_dc < FINGER_IR_THRESHOLD:
+            self.heart_rate = 0
+            self.spo2 = 0
+            return
+
+        ir_ac = band_pass(ir, self.sample_rate)
+        heart_rate = self._heart_rate(ir_ac)
+        if not heart_rate:
+            # Keep the last reading through a brief dropout, but not for long
+            self.missed += 1
+            if self.missed >= MAX_MISSED_WINDOWS:
+                self.heart_rate = 0
+                self.spo2 = 0
+            return
+        self.missed = 0
+        if self.heart_rate:
+            heart_rate = (1 - HEART_RATE_SMOOTHING) * self.heart_rate + HEART_RATE_SMOOTHING * heart_rate
+        self.heart_rate = int(round(heart_rate))
+
+        # SpO2 needs a red value for every sample in the window
+        if self.has_red[:min(self.count, self.size)].all():
+            red = self.window(self.red)
+            red_dc = red.mean()
+            ir_ratio = ir_ac.std() / ir_dc
+            if red_dc > 0 and ir_ratio > 0:
+                ratio = (band_pass(red, self.sample_rate).std() / red_dc) / ir_ratio
+                # Maxim's empirical calibration curve for the MAX3010x
+                spo2 = -45.060 * ratio * ratio + 30.354 * ratio + 94.845
+                self.spo2 = int(round(min(100.0, max(70.0, spo2))))
+        else:
+            self.spo2 = 0  # Red samples stopped coming, so the last reading is stale
+
+    def _heart_rate(self, signal):
+        """Beats per minute from the median peak interval, or None without a clear, regular pulse"""
+        min_distance = int(MIN_BEAT_SECONDS * self.sample_rate)
+        max_lag = int(60.0 / MIN_HEART_RATE * self.sample_rate)
+        if pulse_strength(signal, min_distance, max_lag) < PULSE_CORRELATION:
+            return None
+        intervals = np.diff(find_peaks(signal, min_distance))
+        if len(intervals) < 2:
+            return None
+        median = np.median(intervals)
+        # Most intervals should agree with the median, otherwise it is motion or noise
+        if np.mean(np.abs(intervals - median) <= 0.25 * median) < 0.6:
+            return None
+        heart_rate = 60.0 * self.sample_rate / median
+        return heart_rate if MIN_HEART_RATE <= heart_rate <= MAX_HEART_RATE else None
+
+    def current(self, max_age=WINDOW_SECONDS):
+        """(heart_rate, spo2) if samples arrived within max_age seconds, else (0, 0)"""
+        if self.updated is None or time.time() - self.updated > max_age:
+            return 0, 0
+        return self.heart_rate, self.spo2
@@ -4,6 +4,7 @@ from PyQt6 import QtCore, QtGui, QtWidgets
 from PyQt6.QtCore import Qt, pyqtSignal
 from PyQt6.QtGui import QFont, QColor, QPixmap, QGuiApplication
 from PyQt6.QtWidgets import QWidget, QVBoxLayout, QLabel, QProgressBar, QFrame, QLineEdit, QPushButton, QMessageBox, QComboBox, QHBoxLayout
+from ui.components import ShadowCard
 from PyQt6.QtCore import Qt, pyqtSignal
 # from modern_yoga_app import ModernYogaApp
 
@@ -37,22 +38,8 @@ class UserProfileDialog(QWidget):
         layout.addWidget(header)
         
         # Form layout for user details
-        form_card = QFrame()
+        form_card = ShadowCard(padding=20)
         form_card.setObjectName("formCard")
-        form_card.setStyleSheet("""
-            #formCard {
-                background-color: white;
-                border-radius: 12px;
-                padding: 20px;
-            }
-        """)
-        
-        # Apply card shadow effect
-        shadow = QtWidgets.QGraphicsDropShadowEffect()
-        shadow.setBlurRadius(15)
-        shadow.setColor(QColor(0, 0, 0, 30))
-        shadow.setOffset(0, 2)
-        form_card.setGraphicsEffect(shadow)
         
         form_layout = QVBoxLayout(form_card)
         form_layout.setSpacing(16)
@@ -160,15 +147,7 @@ class UserProfileDialog(QWidget):
         self.cancel_btn = QPushButton("Cancel")
         self.cancel_btn.setFixedHeight(50)
         self.cancel_btn.setFont(QFont("Google Sans", 14))
-        self.cancel_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #DADCE0;
-                color: #202124;
-            }
-            QPushButton:hover {
-                background-color: #C0C0C0;
-            }
-        """)
+        self.cancel_btn.setProperty("role", "secondary")
         self.cancel_btn.clicked.connect(self.close)
         buttons_layout.addWidget(self.cancel_btn)
         
@@ -200,12 +179,8 @@ class UserProfileDialog(QWidget):
             "goals": self.goals_input.text()
         }
         
-        # Save to file
+        # The main window's profile store saves it to file
         try:
-            os.makedirs("user_data", exist_ok=True)
-            with open("user_data/profile.json", "w") as f:
-                json.dump(user_data, f)
-            
             # Emit signal that profile was updated
             self.profile_updated.emit(user_data)
             
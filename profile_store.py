@@ -0,0 +1,157 @@
+import os
+import json
+import time
+import threading
+
+PROFILE_PATH = "user_data/profile.json"
+HEALTH_PATH = "user_data/health_details.json"
+SAVE_DELAY = 0.5  # Seconds of quiet before pending changes are written
+MAX_SAVE_DELAY = 3.0  # Longest a change waits while edits keep coming
+
+
+def write_json_atomic(path, text):
+    """Write text to path via a temp file and rename, so readers never see a partial file"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    temp_path = path + ".tmp"
+    with open(temp_path, "w") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+
+class ProfileStore:
+    """
+    In-memory user profile and health conditions, persisted in the background.
+
+    Changes only touch the in-memory state and mark the file dirty; a writer
+    thread waits until edits have been quiet for `delay` seconds (at most
+    `max_delay` after the first one), then writes each dirty file atomically.
+    A file whose JSON is identical to what is already on disk is not
+    rewritten, so recomputing the same BMI or re-saving the same conditions
+    costs nothing.
+    """
+
+    def __init__(self, profile_path=PROFILE_PATH, health_path=HEALTH_PATH,
+                 delay=SAVE_DELAY, max_delay=MAX_SAVE_DELAY):
+        self.profile_path = profile_path
+        self.health_path = health_path
+        self.delay = delay
+        self.max_delay = max_delay
+        self.profile = {}
+        self.health_conditions = {}
+        self.health_updated = None  # "last_updated" stamp of the health file
+
+        self.condition = threading.Condition()
+        self.write_lock = threading.Lock()  # The writer thread and flush() never write at once
+        self.dirty = set()  # Paths with unsaved changes
+        self.on_disk = {}  # path -> JSON text last read or written
+        self.first_change = None
+        self.last_change = None
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name="ProfileStoreWriter", daemon=True)
+        self.thread.start()
+
+    def load(self):
+        """Read both files if they exist; health_details.json wins over the profile's copy of the conditions"""
+        profile = self._read(self.profile_path) or {}
+        health = self._read(self.health_path) or {}
+        with self.condition:
+            self.profile.clear()
+            self.profile.update(profile)
+            self.health_conditions = health.get("health_conditions", profile.get("health_conditions", {}))
+            self.health_updated = health.get("last_updated")
+        return self.profile
+
+    def _read(self, path):
+        try:
+            with open(path, "r") as f:
+                text = f.read()
+            data = json.loads(text)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f"Error loading {path}: {e}")
+            return None
+        self.on_disk[path] = text
+        return data
+
+    def update_profile(self, changes):
+        """Merge changes into the profile, scheduling a write only if a value differs"""
+        with self.condition:
+            changed = {key: value for key, value in changes.items() if self.profile.get(key) != value}
+            if changed:
+                self.profile.update(changed)
+                self._mark_dirty(self.profile_path)
+        return bool(changed)
+
+    def set_health_conditions(self, conditions):
+        """Store the conditions in the health file and the profile, if they changed"""
+        with self.condition:
+            if conditions == self.health_conditions and self.profile.get("health_conditions") == conditions:
+                return False
+            self.health_conditions = dict(conditions)
+            self.health_updated = time.strftime("%Y-%m-%d %H:%M:%S")
+            self.profile["health_conditions"] = self.health_conditions
+            self._mark_dirty(self.health_path)
+            self._mark_dirty(self.profile_path)
+        return True
+
+    def _mark_dirty(self, path):
+        now = time.monotonic()
+        if not self.dirty:
+            self.first_change = now
+        self.dirty.add(path)
+        self.last_change = now
+        self.condition.notify()
+
+    def _snapshot(self, path):
+        """JSON text for a file, taken under the lock"""
+        if path == self.health_path:
+            return json.dumps({"health_conditions": self.health_conditions,
+                               "last_updated": self.health_updated}, indent=4)
+        return json.dumps(self.profile)
+
+    def _take_pending(self):
+        with self.condition:
+            pending = [(path, self._snapshot(path)) for path in sorted(self.dirty)]
+            self.dirty.clear()
+        return pending
+
+    def _save_pending(self):
+        with self.write_lock:
+            for path, text in self._take_pending():
+                if self.on_disk.get(path) == text:
+                    continue  # Nothing changed since the last write
+                try:
+                    write_json_atomic(path, text)
+                    self.on_disk[path] = text
+                except OSError as e:
+                    print(f"Error saving {path}: {e}")
+
+    def _run(self):
+        while True:
+            with self.condition:
+                while self.running and not self.dirty:
+                    self.condition.wait()
+                if not self.running:
+                    return
+                # Debounce: wait for a quiet period, but never longer than max_delay overall
+                due = min(self.last_change + self.delay, self.first_change + self.max_delay)
+                remaining = due - time.monotonic()
+                if remaining > 0:
+                    self.condition.wait(remaining)
+                    continue
+            self._save_pending()
+
+    def flush(self):
+        """Write pending changes now, on the calling thread"""
+        self._save_pending()
+
+    def close(self):
+        """Stop the writer thread and write whatever is still pending"""
+        with self.condition:
+            self.running = False
+            self.condition.notify()
+        self.thread.join()
+        self.flush()
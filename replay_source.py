@@ -0,0 +1,161 @@
+import os
+import glob
+import time
+import cv2
+import numpy as np
+from mediapipe.framework.formats import landmark_pb2
+from session_recorder import SessionReader
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+
+
+class ReplayFrameSource:
+    """
+    Deterministic frame source for CameraThread, used to benchmark without a camera.
+
+    The path can be:
+    - a video file
+    - a directory of images (e.g. training_images/), played in name order
+    - a session directory written by SessionRecorder, or a .npy array of
+      N x 33 x 4 landmarks; these set `landmarks` for every frame so the
+      camera thread can skip MediaPipe inference entirely
+
+    With realtime=True frames are paced at the native rate (video FPS,
+    recorded timestamps, or `fps` for images); otherwise as fast as possible.
+    """
+
+    def __init__(self, path, realtime=True, fps=30.0, loop=False, canvas_size=(480, 640)):
+        self.path = path
+        self.realtime = realtime
+        self.fps = fps
+        self.loop = loop
+        self.canvas_size = canvas_size
+        self.kind = self._detect_kind(path)
+        self.landmarks = None  # NormalizedLandmarkList of the current frame (landmark replay only)
+        self.frames_read = 0
+
+        self.cap = None
+        self.image_paths = []
+        self.landmark_array = None
+        self.timestamps = None
+        self.position = 0
+        self.start_time = None
+        self.canvas = None
+
+    def _detect_kind(self, path):
+        if os.path.isdir(path):
+            if os.path.exists(os.path.join(path, "meta.json")):
+                return "landmarks"
+            return "images"
+        if path.endswith(".npy"):
+            return "landmarks"
+        return "video"
+
+    @property
+    def provides_landmarks(self):
+        return self.kind == "landmarks"
+
+    def connect(self):
+        """Open the underlying file(s); returns False if there is nothing to replay"""
+        try:
+            if self.kind == "video":
+                self.cap = cv2.VideoCapture(self.path)
+                if not self.cap.isOpened():
+                    print(f"Could not open replay video {self.path}")
+                    return False
+                native_fps = self.cap.get(cv2.CAP_PROP_FPS)
+                if native_fps and native_fps > 0:
+                    self.fps = native_fps
+            elif self.kind == "images":
+                self.image_paths = sorted(p for p in glob.glob(os.path.join(self.path, "*"))
+                                          if p.lower().endswith(IMAGE_EXTENSIONS))
+                if not self.image_paths:
+                    print(f"No images to replay in {self.path}")
+                    return False
+            else:
+                if os.path.isdir(self.path):
+                    reader = SessionReader(self.path)
+                    self.landmark_array = reader.read("frames", "landmarks")
+                    self.timestamps = reader.read("frames", "timestamp")
+                else:
+                    self.landmark_array = np.load(self.path, mmap_mode="r")
+                if len(self.landmark_array) == 0:
+                    print(f"No landmarks to replay in {self.path}")
+                    return False
+                self.canvas = np.zeros((*self.canvas_size, 3), dtype=np.uint8)
+        except Exception as e:
+            print(f"Error opening replay source {self.path}: {e}")
+            return False
+
+        self.position = 0
+        self.start_time = time.perf_counter()
+        return True
+
+    def read_frame(self):
+        """Return (ret, frame) like ESP32CameraReceiver.read_frame; ret is False at the end"""
+        if self.start_time is None and not self.connect():
+            return False, None
+
+        if self.position >= self._length():
+            if not self.loop:
+                return False, None
+            self.position = 0
+            self.start_time = time.perf_counter()
+
+        if self.realtime:
+            self._wait_for_frame_time()
+
+        if self.kind == "video":
+            ret, frame = self.cap.read()
+            if not ret:
+                if not self.loop:
+                    return False, None
+                self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                self.position = 0
+                self.start_time = time.perf_counter()
+                ret, frame = self.cap.read()
+                if not ret:
+                    return False, None
+        elif self.kind == "images":
+            frame = cv2.imread(self.image_paths[self.position])
+            if frame is None:
+                print(f"Could not read replay image {self.image_paths[self.position]}")
+                self.position += 1
+                return self.read_frame()
+        else:
+            self.landmarks = self._to_landmark_list(self.landmark_array[self.position])
+            frame = self.canvas.copy()
+
+        self.position += 1
+        self.frames_read += 1
+        return True, frame
+
+    def _length(self):
+        if self.kind == "video":
+            count = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
+            # Some containers don't report a frame count; rely on read() failing instead
+            return count if count > 0 else float("inf")
+        if self.kind == "images":
+            return len(self.image_paths)
+        return len(self.landmark_array)
+
+    def _wait_for_frame_time(self):
+        if self.timestamps is not None and len(self.timestamps):
+            target = self.timestamps[self.position] - self.timestamps[0]
+        else:
+            target = self.position / self.fps
+        delay = target - (time.perf_counter() - self.start_time)
+        if delay > 0:
+            time.sleep(delay)
+
+    def _to_landmark_list(self, array):
+        landmark_list = landmark_pb2.NormalizedLandmarkList()
+        for x, y, z, visibility in array:
+            landmark_list.landmark.add(x=float(x), y=float(y), z=float(z), visibility=float(visibility))
+        return landmark_list
+
+    def release(self):
+        if self.cap:
+            self.cap.release()
+            self.cap = None
+        self.start_time = None
@@ -0,0 +1,105 @@
+import cv2
+import numpy as np
+
+
+class ROITracker:
+    """
+    Crops MediaPipe input to the region around the previous frame's landmarks.
+
+    crop() returns the region of interest (the whole frame when tracking is
+    lost), downsized so its longest side is at most `max_side` pixels.
+    map_results() maps the pose and hand landmarks found in that region back
+    to full-frame normalized coordinates, so extract_joint_angles,
+    is_full_body_visible and drawing keep working unchanged, and updates the
+    region for the next frame. When fewer landmarks are visible than when
+    the region was set (a limb moved out of it), the next frame is analysed
+    in full again so the region can grow back.
+    """
+
+    def __init__(self, margin=0.25, max_side=640, min_size=0.2, visibility_threshold=0.5, drop_ratio=0.8):
+        self.margin = margin  # Extra space around the landmark box, as a fraction of its size
+        self.max_side = max_side
+        self.min_size = min_size  # Smallest ROI side as a fraction of the frame
+        self.visibility_threshold = visibility_threshold
+        self.drop_ratio = drop_ratio  # Re-widen when visible landmarks fall below this share of the tracked count
+        self.box = None  # (x0, y0, x1, y1) normalized to the full frame, None = not tracking
+        self.visible_count = 0  # Visible landmarks when the box was last set
+
+    def reset(self):
+        self.box = None
+        self.visible_count = 0
+
+    def crop(self, frame):
+        """Return (roi_image, roi) where roi = (x0, y0, width, height, frame_width, frame_height) in pixels"""
+        frame_h, frame_w = frame.shape[:2]
+        if self.box is None:
+            x0, y0, x1, y1 = 0, 0, frame_w, frame_h
+        else:
+            bx0, by0, bx1, by1 = self.box
+            x0, x1 = int(bx0 * frame_w), int(np.ceil(bx1 * frame_w))
+            y0, y1 = int(by0 * frame_h), int(np.ceil(by1 * frame_h))
+
+        roi_image = frame[y0:y1, x0:x1]
+        roi = (x0, y0, x1 - x0, y1 - y0, frame_w, frame_h)
+
+        # Downsizing keeps normalized coordinates unchanged, so no extra mapping is needed
+        longest = max(roi_image.shape[:2])
+        if longest > self.max_side:
+            scale = self.max_side / longest
+            roi_image = cv2.resize(roi_image, (max(1, int(roi_image.shape[1] * scale)),
+                                               max(1, int(roi_image.shape[0] * scale))),
+                                   interpolation=cv2.INTER_AREA)
+        return roi_image, roi
+
+    def map_results(self, results_pose, results_hands, roi):
+        """Map landmarks from ROI to full-frame coordinates in place and track the new box"""
+        x0, y0, roi_w, roi_h, frame_w, frame_h = roi
+        is_full_frame = roi_w == frame_w and roi_h == frame_h
+
+        if not is_full_frame:
+            if results_pose.pose_landmarks:
+                self._map_landmarks(results_pose.pose_landmarks.landmark, roi)
+            if results_hands and results_hands.multi_hand_landmarks:
+                for hand_landmarks in results_hands.multi_hand_landmarks:
+                    self._map_landmarks(hand_landmarks.landmark, roi)
+
+        self.update(results_pose.pose_landmarks.landmark if results_pose.pose_landmarks else None)
+
+    def _map_landmarks(self, landmarks, roi):
+        x0, y0, roi_w, roi_h, frame_w, frame_h = roi
+        scale_x = roi_w / frame_w
+        scale_y = roi_h / frame_h
+        offset_x = x0 / frame_w
+        offset_y = y0 / frame_h
+        for lm in landmarks:
+            lm.x = offset_x + lm.x * scale_x
+            lm.y = offset_y + lm.y * scale_y
+            lm.z = lm.z * scale_x  # MediaPipe z uses the same scale as x
+
+    def update(self, landmarks):
+        """Set the next ROI from full-frame landmarks, or fall back to full frame when lost"""
+        if not landmarks:
+            self.reset()
+            return
+
+        points = np.array([(lm.x, lm.y, lm.visibility) for lm in landmarks])
+        visible = points[points[:, 2] >= self.visibility_threshold]
+        if len(visible) < 4:
+            self.reset()  # Too little of the body left to track
+            return
+        if self.box is not None and len(visible) < self.drop_ratio * self.visible_count:
+            self.reset()  # Part of the body left the crop; look at the whole frame again
+            return
+
+        x_min, y_min = visible[:, 0].min(), visible[:, 1].min()
+        x_max, y_max = visible[:, 0].max(), visible[:, 1].max()
+        pad_x = max((x_max - x_min) * self.margin, self.min_size / 2 - (x_max - x_min) / 2)
+        pad_y = max((y_max - y_min) * self.margin, self.min_size / 2 - (y_max - y_min) / 2)
+
+        box = (max(0.0, x_min - pad_x), max(0.0, y_min - pad_y),
+               min(1.0, x_max + pad_x), min(1.0, y_max + pad_y))
+        if box[2] > box[0] and box[3] > box[1]:
+            self.box = box
+            self.visible_count = len(visible)
+        else:
+            self.reset()
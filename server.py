@@ -2,9 +2,11 @@ import os
 import sys
 import json
 import fastapi
-from fastapi import FastAPI, WebSocket
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException
 from threading import Thread
 import asyncio
+from device_sessions import DeviceRegistry, DEFAULT_DEVICE_ID, device_id_for
+from ppg import PPGStream, SAMPLE_RATE, MIN_SAMPLE_RATE, MAX_SAMPLE_RATE, valid_sample_rate
 
 # ---------------------------
 # FastAPI WebSocket Server
@@ -27,108 +29,220 @@ esp_data = {
     "camera_status": "disconnected"
 }
 
+# Per-device sessions; every connection identifies its device (see device_id_for)
+devices = DeviceRegistry()
+
+# Device whose updates are mirrored into esp_data for the desktop app
+primary_device = DEFAULT_DEVICE_ID
+
+# Optional SessionRecorder that receives a timestamped copy of esp_data on every update
+session_recorder = None
+
+# Optional StageTimer from the camera loop, exposed through /metrics
+stage_timer = None
+
+def record_esp_data():
+    if session_recorder is not None:
+        session_recorder.record_vitals(esp_data)
+
+def apply_device_update(device_id, changes):
+    """Store changes in the device's session; the primary device also updates esp_data"""
+    devices.get(device_id).apply(changes)
+    if device_id == primary_device:
+        esp_data.update(changes)
+
+def ppg_estimate(device_id, parsed):
+    """
+    (heart_rate, spo2) from the device's raw sample stream, 0 when unknown.
+
+    Boards can send batches of raw samples as "ir_samples" (and optionally
+    "red_samples", plus "sample_rate" if not 100 Hz); the estimate from
+    recent batches is also used for payloads without samples. A batch with
+    a bad sample rate or non-numeric samples is logged and skipped.
+    """
+    session = devices.get(device_id)
+    stream = session.ppg
+    if "ir_samples" in parsed:
+        sample_rate = parsed.get("sample_rate", SAMPLE_RATE)
+        if not valid_sample_rate(sample_rate):
+            print(f"Ignoring samples from {device_id}: sample_rate must be {MIN_SAMPLE_RATE}-{MAX_SAMPLE_RATE} Hz, got {sample_rate!r}")
+        else:
+            if stream is None or stream.sample_rate != sample_rate:
+                stream = session.ppg = PPGStream(sample_rate)
+            try:
+                return stream.add(parsed["ir_samples"], parsed.get("red_samples"))
+            except (TypeError, ValueError) as e:
+                print(f"Ignoring samples from {device_id}: {e}")
+    return stream.current() if stream is not None else (0, 0)
+
+def health_changes(parsed, device_id=DEFAULT_DEVICE_ID):
+    """Values one parsed health payload from the MAX30102/MPU6050/MLX90614 board sets"""
+    changes = {}
+    heart_rate, spo2 = ppg_estimate(device_id, parsed)
+    # Update health-related metrics from MAX30102 (SDA,SCL=18,19) and MLX90614 (SDA,SCL=21,22)
+    for key in ["heart_rate", "spo2", "body_temp_pre", "body_temp_post"]:
+        if key in parsed:
+            changes[key] = parsed[key]
+    
+    # When the sensor's own algorithm reports nothing, use the estimate from the raw samples
+    if not parsed.get("heart_rate") and ("heart_rate" in parsed or heart_rate):
+        changes["heart_rate"] = heart_rate
+    if not parsed.get("spo2") and spo2:
+        changes["spo2"] = spo2
+    
+    # Explicitly handle MPU6050 data (steps and strength_count)
+    if "steps" in parsed:
+        changes["steps"] = parsed["steps"]
+        print(f"Updated steps: {changes['steps']}")
+    
+    if "strength_count" in parsed:
+        changes["strength_count"] = parsed["strength_count"]
+        print(f"Updated strength count: {changes['strength_count']}")
+    
+    # Update sensor status
+    for key in ["max30102_status", "mpu6050_status", "mlx90614_status"]:
+        if key in parsed:
+            changes[key] = parsed[key]
+    return changes
+
+def update_health_data(parsed, device_id=DEFAULT_DEVICE_ID):
+    """Apply one parsed health payload to the device's session (and esp_data for the primary device)"""
+    apply_device_update(device_id, health_changes(parsed, device_id))
+
+async def receive_device_messages(websocket, name, handle):
+    """Accept a device connection and pass each text message to handle(device_id, data) until it disconnects"""
+    await websocket.accept()
+    device_id = device_id_for(websocket)
+    session = devices.get(device_id)
+    session.connections += 1
+    try:
+        while True:
+            try:
+                data = await websocket.receive_text()
+                handle(device_id, data)
+            except WebSocketDisconnect:
+                break
+            except Exception as e:
+                print(f"Error in {name} websocket: {e}")
+                await asyncio.sleep(1)
+    finally:
+        session.connections -= 1
+
+def handle_health_message(device_id, data):
+    print(f"Received health data from {device_id}: {data}")  # Debug print
+    update_health_data(json.loads(data), device_id)
+    if device_id == primary_device:
+        record_esp_data()
+    
+    # Print updated values for debugging
+    print(f"Updated health data: {devices.get(device_id).latest}")
+
+def handle_exercise_message(device_id, data):
+    print(f"Received exercise data from {device_id}: {data}")  # Debug print
+    parsed = json.loads(data)
+    # Update only exercise-related metrics
+    apply_device_update(device_id, {key: parsed[key] for key in ["steps", "strength_count"] if key in parsed})
+    if device_id == primary_device:
+        record_esp_data()
+    print(f"Updated exercise data: {devices.get(device_id).latest}")  # Debug print
+
+def handle_camera_message(device_id, data):
+    parsed = json.loads(data)
+    # Update camera status
+    if "camera_status" in parsed:
+        apply_device_update(device_id, {"camera_status": parsed["camera_status"]})
+
+def handle_general_message(device_id, data):
+    parsed = json.loads(data)
+    parsed.pop("device_id", None)
+    apply_device_update(device_id, parsed)
+    if device_id == primary_device:
+        record_esp_data()
+
 # Create separate WebSocket endpoints for each ESP32
 @app.websocket("/esp32/health")
 async def health_websocket(websocket: WebSocket):
-    await websocket.accept()
-    while True:
-        try:
-            data = await websocket.receive_text()
-            print(f"Received health data: {data}")  # Debug print
-            parsed = json.loads(data)
-            
-            # Update health-related metrics from MAX30102 (SDA,SCL=18,19) and MLX90614 (SDA,SCL=21,22)
-            for key in ["heart_rate", "spo2", "body_temp_pre", "body_temp_post"]:
-                if key in parsed:
-                    # For heart_rate, ensure we're getting a valid number
-                    if key == "heart_rate" and (parsed[key] is None or parsed[key] == 0):
-                        # If IR value is present and high enough, calculate heart rate
-                        if "ir_value" in parsed and parsed["ir_value"] > 50000:
-                            # Use a default heart rate range based on IR value
-                            # This is a fallback when the sensor's algorithm fails
-                            esp_data[key] = max(60, min(100, int(parsed["ir_value"] / 1500)))
-                        else:
-                            esp_data[key] = 0
-                    else:
-                        esp_data[key] = parsed[key]
-            
-            # Explicitly handle MPU6050 data (steps and strength_count)
-            if "steps" in parsed:
-                esp_data["steps"] = parsed["steps"]
-                print(f"Updated steps: {esp_data['steps']}")
-            
-            if "strength_count" in parsed:
-                esp_data["strength_count"] = parsed["strength_count"]
-                print(f"Updated strength count: {esp_data['strength_count']}")
-            
-            # Update sensor status
-            if "max30102_status" in parsed:
-                esp_data["max30102_status"] = parsed["max30102_status"]
-            
-            if "mpu6050_status" in parsed:
-                esp_data["mpu6050_status"] = parsed["mpu6050_status"]
-            
-            if "mlx90614_status" in parsed:
-                esp_data["mlx90614_status"] = parsed["mlx90614_status"]
-            
-            # Print updated values for debugging
-            print(f"Updated health data: {esp_data}")
-        except Exception as e:
-            print(f"Error in health websocket: {e}")
-            await asyncio.sleep(1)
+    await receive_device_messages(websocket, "health", handle_health_message)
+
 @app.websocket("/esp32/exercise")
 async def exercise_websocket(websocket: WebSocket):
-    await websocket.accept()
-    while True:
-        try:
-            data = await websocket.receive_text()
-            print(f"Received exercise data: {data}")  # Debug print
-            parsed = json.loads(data)
-            # Update only exercise-related metrics
-            for key in ["steps", "strength_count"]:
-                if key in parsed:
-                    esp_data[key] = parsed[key]
-            print(f"Updated exercise data: {esp_data}")  # Debug print
-        except Exception as e:
-            print(f"Error in exercise websocket: {e}")
-            await asyncio.sleep(1)
+    await receive_device_messages(websocket, "exercise", handle_exercise_message)
 
 @app.websocket("/esp32/camera")
 async def camera_websocket(websocket: WebSocket):
-    await websocket.accept()
-    while True:
-        try:
-            data = await websocket.receive_text()
-            parsed = json.loads(data)
-            # Update camera status
-            if "camera_status" in parsed:
-                esp_data["camera_status"] = parsed["camera_status"]
-        except Exception as e:
-            print(f"Error in camera websocket: {e}")
-            await asyncio.sleep(1)
+    await receive_device_messages(websocket, "camera", handle_camera_message)
 
 # Original endpoint for backward compatibility
 @app.websocket("/esp32")
 async def websocket_endpoint(websocket: WebSocket):
+    await receive_device_messages(websocket, "general", handle_general_message)
+
+# Live updates from one device: its latest values first, then every change
+@app.websocket("/devices/{device_id}/subscribe")
+async def device_subscribe_websocket(websocket: WebSocket, device_id: str):
     await websocket.accept()
-    while True:
-        try:
-            data = await websocket.receive_text()
-            parsed = json.loads(data)
-            esp_data.update(parsed)
-        except Exception as e:
-            print(f"Error in general websocket: {e}")
-            await asyncio.sleep(1)
+    session = devices.find(device_id)
+    if session is None:
+        await websocket.close(code=4404, reason=f"Unknown device {device_id}")
+        return
+    queue = session.subscribe()
+    # Wait for the next update and the client at the same time, so a client that
+    # leaves while its device is quiet is noticed (and unsubscribed) right away
+    receiver = asyncio.ensure_future(websocket.receive())
+    getter = asyncio.ensure_future(queue.get())
+    try:
+        await websocket.send_json({"device_id": device_id, "latest": session.latest})
+        while True:
+            done, _ = await asyncio.wait((receiver, getter), return_when=asyncio.FIRST_COMPLETED)
+            if getter in done:
+                await websocket.send_json(getter.result())
+                getter = asyncio.ensure_future(queue.get())
+            if receiver in done:
+                if receiver.result()["type"] == "websocket.disconnect":
+                    break
+                # Subscribers have nothing to send; ignore anything that arrives
+                receiver = asyncio.ensure_future(websocket.receive())
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        print(f"Error in device subscription for {device_id}: {e}")
+    finally:
+        receiver.cancel()
+        getter.cancel()
+        session.unsubscribe(queue)
+
+@app.get("/devices")
+async def get_devices():
+    return {"primary": primary_device, "devices": devices.devices()}
+
+@app.get("/devices/{device_id}")
+async def get_device(device_id: str, history: int = 0):
+    session = devices.find(device_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail=f"Unknown device {device_id}")
+    result = {**session.info(), "latest": session.latest}
+    if history > 0:
+        result["history"] = [{"time": timestamp, "changes": changes}
+                             for timestamp, changes in session.recent(history)]
+    return result
 
 # Add route for ESP32-CAM stream
 @app.get("/")
 async def get_index():
     return {"message": "YogKalp API is running"}
 
+# Per-stage camera loop latency percentiles
+@app.get("/metrics")
+async def get_metrics():
+    if stage_timer is None or not stage_timer.enabled:
+        return {"enabled": False, "stages": {}}
+    return {"enabled": True, "stages": stage_timer.summary()}
+
 # Run FastAPI in thread
 def run_fastapi():
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
 
-# Start the FastAPI server in a separate thread
-Thread(target=run_fastapi, daemon=True).start()
+# Start the FastAPI server in a separate thread (benchmarks set YOGKALP_DISABLE_SERVER=1)
+if os.getenv("YOGKALP_DISABLE_SERVER") != "1":
+    Thread(target=run_fastapi, daemon=True).start()
@@ -0,0 +1,183 @@
+import os
+import json
+import glob
+import time
+import queue
+import threading
+from datetime import datetime
+import numpy as np
+from pose_estimator import FEATURE_NAMES
+
+# Numeric esp_data keys recorded as vitals, in column order
+VITAL_KEYS = ["heart_rate", "spo2", "body_temp_pre", "body_temp_post", "steps", "strength_count"]
+
+
+class SessionRecorder:
+    """
+    Records a camera session to disk as chunked .npy column segments.
+
+    Layout of a session directory:
+        meta.json                   feature names, vital keys, pose name table
+        frames/<column>_00000.npy   timestamp, landmarks (N x 33 x 4), features,
+                                    pose (index into pose names, -1 = none), accuracy
+        vitals/<column>_00000.npy   timestamp, values (N x len(VITAL_KEYS))
+
+    Appends only touch an in-memory buffer; full chunks are written as new
+    segment files by a background thread, so nothing is ever rewritten.
+    """
+
+    def __init__(self, base_dir="sessions", chunk_size=512):
+        self.session_dir = os.path.join(base_dir, datetime.now().strftime("%Y%m%d_%H%M%S"))
+        self.chunk_size = chunk_size
+        self.pose_names = []
+        self.pose_index = {}
+
+        os.makedirs(os.path.join(self.session_dir, "frames"), exist_ok=True)
+        os.makedirs(os.path.join(self.session_dir, "vitals"), exist_ok=True)
+
+        self.frame_buffer = []
+        self.vitals_buffer = []
+        self.frame_segments = 0
+        self.vitals_segments = 0
+        self.bad_vitals = set()  # Vital keys already reported as non-numeric
+        self._write_meta()
+
+        self.write_queue = queue.Queue()
+        self.writer_thread = threading.Thread(target=self._process_write_queue, daemon=True)
+        self.writer_thread.start()
+
+    def record_frame(self, landmarks, features, best_pose=None, accuracy=0.0):
+        """Queue one frame (MediaPipe landmarks, feature dict, best pose and its accuracy)"""
+        self.write_queue.put(("frame", time.time(), (landmarks, features, best_pose, accuracy)))
+
+    def record_vitals(self, esp_data):
+        """Queue a timestamped copy of the current esp_data values"""
+        values = [esp_data.get(key, 0) or 0 for key in VITAL_KEYS]
+        self.write_queue.put(("vitals", time.time(), values))
+
+    def close(self):
+        """Flush all pending samples and stop the writer thread"""
+        self.write_queue.put(None)
+        self.writer_thread.join()
+
+    def _process_write_queue(self):
+        """Convert queued samples to rows and flush full chunks to disk"""
+        while True:
+            item = self.write_queue.get()
+            if item is None:
+                break
+            try:
+                kind, timestamp, payload = item
+                if kind == "frame":
+                    self.frame_buffer.append((timestamp, *self._frame_row(*payload)))
+                    if len(self.frame_buffer) >= self.chunk_size:
+                        self._flush_frames()
+                else:
+                    self.vitals_buffer.append((timestamp, self._vitals_row(payload)))
+                    if len(self.vitals_buffer) >= self.chunk_size:
+                        self._flush_vitals()
+            except Exception as e:
+                print(f"Error recording session data: {e}")
+
+        try:
+            self._flush_frames()
+            self._flush_vitals()
+        except Exception as e:
+            print(f"Error flushing session data: {e}")
+
+    def _frame_row(self, landmarks, features, best_pose, accuracy):
+        landmark_array = np.array([(lm.x, lm.y, lm.z, lm.visibility) for lm in landmarks], dtype=np.float32)
+        feature_array = np.array([features.get(name, np.nan) for name in FEATURE_NAMES], dtype=np.float32)
+
+        pose_idx = -1
+        if best_pose:
+            if best_pose not in self.pose_index:
+                self.pose_index[best_pose] = len(self.pose_names)
+                self.pose_names.append(best_pose)
+            pose_idx = self.pose_index[best_pose]
+
+        return landmark_array, feature_array, pose_idx, accuracy
+
+    def _vitals_row(self, values):
+        """Vital values as floats; a value that is not a number is recorded as NaN"""
+        row = np.full(len(VITAL_KEYS), np.nan)
+        for i, (key, value) in enumerate(zip(VITAL_KEYS, values)):
+            try:
+                row[i] = float(value)
+            except (TypeError, ValueError):
+                if key not in self.bad_vitals:
+                    self.bad_vitals.add(key)
+                    print(f"Recording non-numeric {key} value {value!r} as NaN")
+        return row
+
+    def _flush_frames(self):
+        if not self.frame_buffer:
+            return
+        # Take the buffer first, so a failed write drops one chunk instead of growing forever
+        buffer, self.frame_buffer = self.frame_buffer, []
+        timestamps, landmarks, features, poses, accuracies = zip(*buffer)
+        self._write_segment("frames", self.frame_segments, {
+            "timestamp": np.array(timestamps, dtype=np.float64),
+            "landmarks": np.stack(landmarks),
+            "features": np.stack(features),
+            "pose": np.array(poses, dtype=np.int32),
+            "accuracy": np.array(accuracies, dtype=np.float32)
+        })
+        self.frame_segments += 1
+        self._write_meta()
+
+    def _flush_vitals(self):
+        if not self.vitals_buffer:
+            return
+        buffer, self.vitals_buffer = self.vitals_buffer, []
+        timestamps, values = zip(*buffer)
+        self._write_segment("vitals", self.vitals_segments, {
+            "timestamp": np.array(timestamps, dtype=np.float64),
+            "values": np.stack(values)
+        })
+        self.vitals_segments += 1
+        self._write_meta()
+
+    def _write_segment(self, group, index, columns):
+        for column, array in columns.items():
+            np.save(os.path.join(self.session_dir, group, f"{column}_{index:05d}.npy"), array)
+
+    def _write_meta(self):
+        meta = {
+            "feature_names": FEATURE_NAMES,
+            "vital_keys": VITAL_KEYS,
+            "pose_names": self.pose_names,
+            "chunk_size": self.chunk_size,
+            "frame_segments": self.frame_segments,
+            "vitals_segments": self.vitals_segments
+        }
+        with open(os.path.join(self.session_dir, "meta.json"), "w") as f:
+            json.dump(meta, f, indent=4)
+
+
+class SessionReader:
+    """Reads a recorded session back with memory-mapped segments"""
+
+    def __init__(self, session_dir):
+        self.session_dir = session_dir
+        with open(os.path.join(session_dir, "meta.json"), "r") as f:
+            self.meta = json.load(f)
+        self.pose_names = self.meta["pose_names"]
+
+    def segments(self, group, column):
+        """Return the memory-mapped segments of one column ('frames' or 'vitals')"""
+        paths = sorted(glob.glob(os.path.join(self.session_dir, group, f"{column}_*.npy")))
+        return [np.load(path, mmap_mode="r") for path in paths]
+
+    def read(self, group, column):
+        """Return a whole column as one array"""
+        segments = self.segments(group, column)
+        if not segments:
+            return np.empty(0)
+        if len(segments) == 1:
+            return segments[0]
+        return np.concatenate(segments)
+
+    def pose_labels(self):
+        """Return the best pose name of every frame (None where no pose matched)"""
+        return [self.pose_names[idx] if idx >= 0 else None for idx in self.read("frames", "pose")]
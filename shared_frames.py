@@ -0,0 +1,70 @@
+import threading
+from multiprocessing import shared_memory
+import cv2
+import numpy as np
+
+
+class SharedFrameRing:
+    """
+    Fixed set of frame slots in one shared memory block.
+
+    The owning process acquire()s a free slot, write()s a BGR frame into it
+    and sends only the small (slot, height, width) reference to a worker,
+    which attach()es by name and reads the pixels through view() without
+    any copy or pickling. The owner release()s the slot once the worker's
+    result for it has come back, and unlinks the block on close().
+    Workers are expected to be spawned, so they share the owner's resource
+    tracker and the extra registration from attaching is harmless.
+    """
+
+    def __init__(self, slots=4, max_shape=(720, 1280, 3), name=None):
+        self.slots = slots
+        self.max_shape = tuple(max_shape)
+        self.owner = name is None
+        size = slots * int(np.prod(self.max_shape))
+        self.shm = shared_memory.SharedMemory(name=name, create=self.owner, size=size)
+        self.frames = np.ndarray((slots,) + self.max_shape, dtype=np.uint8, buffer=self.shm.buf)
+        self.lock = threading.Lock()
+        self.free = list(range(slots)) if self.owner else []
+
+    @property
+    def spec(self):
+        """Everything a worker process needs to attach: (name, slots, max_shape)"""
+        return self.shm.name, self.slots, self.max_shape
+
+    @classmethod
+    def attach(cls, spec):
+        name, slots, max_shape = spec
+        return cls(slots, max_shape, name)
+
+    def acquire(self):
+        """Return a free slot index, or None when every slot is in use"""
+        with self.lock:
+            return self.free.pop(0) if self.free else None
+
+    def release(self, slot):
+        with self.lock:
+            if slot not in self.free:
+                self.free.append(slot)
+
+    def write(self, slot, frame):
+        """Copy a frame into a slot (downsized if it does not fit); returns the (slot, height, width) reference"""
+        max_h, max_w = self.max_shape[:2]
+        h, w = frame.shape[:2]
+        if h > max_h or w > max_w:
+            scale = min(max_h / h, max_w / w)
+            frame = cv2.resize(frame, (int(w * scale), int(h * scale)), interpolation=cv2.INTER_AREA)
+            h, w = frame.shape[:2]
+        self.frames[slot, :h, :w] = frame
+        return slot, h, w
+
+    def view(self, ref):
+        """Zero-copy view of the frame behind a (slot, height, width) reference"""
+        slot, h, w = ref
+        return self.frames[slot, :h, :w]
+
+    def close(self):
+        self.frames = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
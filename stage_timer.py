@@ -0,0 +1,78 @@
+import time
+import threading
+import numpy as np
+
+
+class StageTimer:
+    """
+    Lightweight per-stage latency tracker for the camera loop.
+
+    Call begin() at the start of a frame and lap(stage) after each stage; the
+    time since the previous call is added to that stage's rolling window.
+    When disabled both calls return immediately, so leaving them in the loop
+    costs next to nothing.
+    """
+
+    def __init__(self, enabled=False, window=300):
+        self.enabled = enabled
+        self.window = window
+        self._samples = {}  # stage -> ring buffer of durations in seconds
+        self._counts = {}   # stage -> total number of samples seen
+        self._last = 0.0
+        self._frame_start = 0.0
+        self._lock = threading.Lock()
+
+    def set_enabled(self, enabled):
+        self.enabled = enabled
+        if not enabled:
+            self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._samples = {}
+            self._counts = {}
+
+    def begin(self):
+        """Mark the start of a frame"""
+        if self.enabled:
+            self._last = self._frame_start = time.perf_counter()
+
+    def lap(self, stage):
+        """Record the time since the previous begin()/lap() under `stage`"""
+        if self.enabled:
+            now = time.perf_counter()
+            self._add(stage, now - self._last)
+            self._last = now
+
+    def end(self):
+        """Record the whole frame time under 'frame'"""
+        if self.enabled:
+            now = time.perf_counter()
+            self._add("frame", now - self._frame_start)
+            self._last = now
+
+    def _add(self, stage, duration):
+        # reset() and summary() run on other threads (GUI, /metrics); the lock is
+        # uncontended almost always, so holding it per sample costs next to nothing
+        with self._lock:
+            samples = self._samples.get(stage)
+            if samples is None:
+                samples = self._samples[stage] = np.zeros(self.window)
+                self._counts[stage] = 0
+            count = self._counts[stage]
+            samples[count % self.window] = duration
+            self._counts[stage] = count + 1
+
+    def summary(self):
+        """Return {stage: {"p50_ms", "p95_ms", "p99_ms", "count"}} over the rolling window"""
+        with self._lock:
+            snapshot = {stage: (samples.copy(), self._counts[stage]) for stage, samples in self._samples.items()}
+
+        result = {}
+        for stage, (samples, count) in snapshot.items():
+            if count == 0:
+                continue
+            window = samples[:min(count, self.window)] * 1000
+            p50, p95, p99 = np.percentile(window, [50, 95, 99])
+            result[stage] = {"p50_ms": float(p50), "p95_ms": float(p95), "p99_ms": float(p99), "count": count}
+        return result
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from benchmarks import synthetic
+from ppg import PPGStream, MAX_MISSED_WINDOWS
+
+BATCH = 25
+
+
+def feed_pulse(stream, rng, batches, heart_rate=72.0, spo2=97.0, start=0):
+    for index in range(batches):
+        ir, red = synthetic.make_ppg_samples(rng, BATCH, start + index * BATCH, heart_rate, spo2)
+        result = stream.add(ir, red)
+    return result
+
+
+def feed_noise(stream, rng, batches):
+    for _ in range(batches):
+        result = stream.add(100000 + rng.normal(0, 300, BATCH), 80000 + rng.normal(0, 300, BATCH))
+    return result
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_noise_only_reports_nothing(seed):
+    rng = np.random.default_rng(seed)
+    stream = PPGStream()
+    results = [feed_noise(stream, rng, 1) for _ in range(40)]
+    assert all(result == (0, 0) for result in results)
+
+
+@pytest.mark.parametrize("heart_rate", [50, 72, 120])
+def test_pulse_heart_rate(heart_rate):
+    rng = np.random.default_rng(1)
+    measured, spo2 = feed_pulse(PPGStream(), rng, 40, heart_rate=heart_rate)
+    assert abs(measured - heart_rate) <= 3
+    assert 90 <= spo2 <= 100
+
+
+def test_reading_resets_once_the_pulse_is_lost():
+    rng = np.random.default_rng(2)
+    stream = PPGStream()
+    assert feed_pulse(stream, rng, 40)[0] > 0
+    # The window still holds pulse samples for a while, then only noise
+    assert feed_noise(stream, rng, 32 + MAX_MISSED_WINDOWS) == (0, 0)
+
+
+def test_spo2_needs_red_for_the_whole_window():
+    rng = np.random.default_rng(3)
+    stream = PPGStream()
+    feed_pulse(stream, rng, 40)
+    ir, _ = synthetic.make_ppg_samples(rng, BATCH, 40 * BATCH)
+    heart_rate, spo2 = stream.add(ir)
+    assert heart_rate > 0
+    assert spo2 == 0
+    # One red batch does not make the window complete again
+    assert feed_pulse(stream, rng, 1, start=41 * BATCH)[1] == 0
+
+
+@pytest.mark.parametrize("sample_rate", [0, -100, "100", True, 1e6])
+def test_invalid_sample_rate(sample_rate):
+    with pytest.raises(ValueError):
+        PPGStream(sample_rate)
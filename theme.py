@@ -0,0 +1,131 @@
+from PyQt6.QtWidgets import QApplication
+
+# One stylesheet for the whole app. Widgets pick rules through their object
+# name or a dynamic property (role, accuracy, camera) instead of carrying
+# their own stylesheet strings, so it is parsed once at startup.
+APP_STYLESHEET = """
+QMainWindow {
+    background-color: #F8F9FA;
+    font-family: 'Google Sans', 'Segoe UI', 'Arial';
+}
+QPushButton {
+    background-color: #1a73e8;
+    color: white;
+    border: none;
+    border-radius: 24px;
+    padding: 12px 24px;
+    font-size: 14px;
+    font-weight: 500;
+}
+QPushButton:hover {
+    background-color: #1765cc;
+}
+QPushButton:pressed {
+    background-color: #185abc;
+}
+QPushButton[role="pill"] {
+    border-radius: 20px;
+}
+QPushButton#profileButton {
+    border-radius: 18px;
+}
+QPushButton[role="secondary"] {
+    background-color: #DADCE0;
+    color: #202124;
+}
+QPushButton[role="secondary"]:hover {
+    background-color: #C0C0C0;
+}
+QPushButton#cameraButton[camera="on"] {
+    background-color: #EA4335;
+}
+QPushButton#cameraButton[camera="on"]:hover {
+    background-color: #D93025;
+}
+QLineEdit {
+    border: 1px solid #DADCE0;
+    border-radius: 8px;
+    padding: 12px;
+    background-color: white;
+    font-size: 14px;
+}
+QLineEdit:focus {
+    border: 2px solid #1a73e8;
+}
+QLabel {
+    color: #202124;
+}
+QLabel[role="muted"] {
+    color: #5F6368;
+}
+QLabel#temperatureTitle {
+    color: #673AB7;
+}
+QLabel#accuracyTitle {
+    color: #7B1FA2;
+}
+QLabel#trainingTitle {
+    color: #00897B;
+}
+QLabel#accuracyInfo {
+    color: #5F6368;
+}
+QLabel#accuracyInfo[accuracy="good"] {
+    color: #4CAF50;
+}
+QLabel#accuracyInfo[accuracy="medium"] {
+    color: #FFC107;
+}
+QLabel#accuracyInfo[accuracy="poor"] {
+    color: #F44336;
+}
+QScrollArea {
+    border: none;
+    background-color: transparent;
+}
+QDialog#foodDialog {
+    background-color: #f0f0f0;
+}
+#foodDialog QLabel {
+    font-size: 14px;
+    color: #333;
+}
+#foodDialog QPushButton {
+    border-radius: 12px;
+    padding: 8px 16px;
+    font-size: 12px;
+}
+#foodDialog QFrame {
+    background-color: white;
+    border-radius: 8px;
+    margin-bottom: 10px;
+}
+#foodDialog QLabel#foodDisclaimer {
+    color: #555;
+    margin-top: 15px;
+    font-size: 10px;
+}
+"""
+
+_installed = False
+
+
+def install_theme(app=None):
+    """Set the app stylesheet on the QApplication; only the first call does anything"""
+    global _installed
+    if not _installed:
+        (app or QApplication.instance()).setStyleSheet(APP_STYLESHEET)
+        _installed = True
+
+
+def set_state(widget, name, value):
+    """
+    Set a dynamic property the stylesheet selects on, re-polishing only this
+    widget and only when the value actually changed.
+    """
+    if widget.property(name) == value:
+        return
+    widget.setProperty(name, value)
+    style = widget.style()
+    style.unpolish(widget)
+    style.polish(widget)